@@ -5,30 +5,55 @@ import aiohttp
 import uuid
 from urllib.parse import quote
 import asyncio
+import importlib
 import time
 from modules import translate as tl
-from huggingface_hub import AsyncInferenceClient
+from modules.message_listeners import from_user, reply_to_bot
+from modules.edit_scheduler import EditScheduler
+from modules.conversations import ConversationStore, turn
 
-def register(bot: commands.Bot, db=None, on_message_listener=[]):
+# Edit-Budgets pro Kanal; auf Modulebene, damit gleichzeitige Streams eines Kanals sie teilen
+edit_scheduler = EditScheduler()
+
+def register(bot: commands.Bot, db=None, message_listeners=None, conversations: ConversationStore = None):
     os.makedirs("../generated_images", exist_ok=True)
 
+    # Verläufe pro Bot-Antwort; ohne Store aus main.py nur im Speicher dieses Moduls
+    if conversations is None:
+        conversations = ConversationStore()
+
     ai_group = discord.SlashCommandGroup(
         name="ai",
         description="AI-bezogene Befehle"
     )
 
-    # 🔹 HUGGING FACE SETUP
+    # 🔹 HUGGING FACE SETUP (huggingface_hub und Modellname erst bei der ersten Anfrage laden)
     HF_TOKEN = os.getenv("HUGGINGFACE_TOKEN")
-    HF_MODEL = db.get('ai-model') or "meta-llama/Llama-2-13b-chat-hf"
-    client = AsyncInferenceClient(model=HF_MODEL, token=HF_TOKEN)
+    hf_client = None
+
+    async def get_client():
+        nonlocal hf_client
+        if hf_client is None:
+            # Import im Thread, damit der Event-Loop nicht blockiert
+            hf = await asyncio.to_thread(importlib.import_module, "huggingface_hub")
+            model = await db.aget('ai-model') or "meta-llama/Llama-2-13b-chat-hf"
+            hf_client = hf.AsyncInferenceClient(model=model, token=HF_TOKEN)
+        return hf_client
 
     # 🔹 Build AI History
     async def build_ai_history(message: discord.Message):
         """
         Baut die Konversation für den AI-Chat auf.
-        Nutzt alle referenzierten Nachrichten (älteste zuerst).
+        Normalfall: Verlauf der beantworteten Bot-Nachricht aus dem ConversationStore
+        plus die neue Frage. Nur für unbekannte Nachrichten (z.B. älter als der Store)
+        werden die referenzierten Nachrichten abgelaufen (älteste zuerst).
         Rollen: 'user' und 'assistant'.
         """
+        if message.reference and message.reference.message_id:
+            stored = await conversations.get(message.reference.message_id)
+            if stored is not None:
+                return stored + [turn("user", message.content)]
+
         history = []
         chain = []
         current = message
@@ -47,58 +72,50 @@ def register(bot: commands.Bot, db=None, on_message_listener=[]):
             options = root.interaction.data.get("options", [])
             prompt = next((opt.get("value") for opt in options if opt["name"] in ["prompt", "question"]), None)
             if prompt:
-                history.append({"role": "user", "content": prompt})
+                history.append(turn("user", prompt))
 
         for msg in chain[1:]:
             if msg.author.bot:
-                history.append({"role": "assistant", "content": msg.content})
+                history.append(turn("assistant", msg.content))
             else:
-                history.append({"role": "user", "content": msg.content})
+                history.append(turn("user", msg.content))
 
         return history
         
     def clean_output(text: str) -> str:
         """Entfernt [INST] Tags aus dem Modelloutput"""
         import re
-    # alles in [INST] [/INST] Blöcken extrahieren
-        cleaned = re.sub(r"\[INST\]|\[/INST\]", "", text)
-    # überflüssige Leerzeilen reduzieren
-        cleaned = "\n".join([line for line in cleaned.splitlines() if line.strip()])
-        return cleaned
-        
+        # nur die Tags; Zeilenumbrüche kommen oft als eigenes Delta und müssen erhalten bleiben
+        return re.sub(r"\[INST\]|\[/INST\]", "", text)
+
     async def stream_response(bot_message, history):
         """
-        Antwort wird nach und nach in Discord-Message gestreamt
-        (mit Buffer & Edit-Limit-Handling)
+        Antwort wird nach und nach in Discord-Message gestreamt. Der Scheduler fasst
+        Deltas zu Edits im Budget des Kanals zusammen und setzt lange Antworten in
+        Folgenachrichten fort, statt den Anfang abzuschneiden. Danach wird der Verlauf
+        samt Antwort unter allen Nachrichten der Antwort gespeichert.
         """
+        history = conversations.trim(history)
+        stream = edit_scheduler.stream(bot_message)
+        answer = None
         try:
-            buffer = ""
-            last_edit = time.time()
-            edit_interval = 0.5  # Sekunden zwischen Edits
+            client = await get_client()
             async with bot_message.channel.typing():
-                stream = await client.chat_completion(messages=history,max_tokens=400,temperature=0.7,top_p=0.9,stream=True)
-                async for event in stream:
+                completion = await client.chat_completion(messages=conversations.payload(history),max_tokens=400,temperature=0.7,top_p=0.9,stream=True)
+                async for event in completion:
                     delta = event.choices[0].delta.get("content", "")
-                    if not delta:
-                        continue
-
-                    delta = clean_output(delta)
-                    buffer += delta
-
-                        # regelmäßig aktualisieren (um Rate-Limits zu vermeiden)
-                    if time.time() - last_edit > edit_interval:
-                        try:
-                            await bot_message.edit(content=buffer[-1900:])  # Discord limit safety
-                            last_edit = time.time()
-                        except Exception:
-                            pass  # falls z. B. edit zu schnell hintereinander passiert
-
-                    # am Ende sicherstellen, dass alles da ist
-                if buffer:
-                    await bot_message.edit(content=buffer[-1900:])
-                    
+                    if delta:
+                        stream.append(clean_output(delta))
+            answer = stream.text
         except Exception as e:
-            await bot_message.edit(content=f"Fehler beim Generkeren deiner Antwort:\n||{e}||")
+            # bisherigen Text behalten, Fehler anhängen
+            stream.append(f"\n\nFehler beim Generieren deiner Antwort:\n||{e}||")
+        finally:
+            # Endstand wird garantiert geschrieben
+            await stream.close()
+        # fehlgeschlagene Antworten nicht als Kontext merken
+        if answer:
+            await conversations.put([message.id for message in stream.messages], list(history) + [turn("assistant", answer)])
         
     # 🔹 /ai ask Command
     @ai_group.command(name="ask", description="Stelle eine Frage an die AI")
@@ -110,11 +127,11 @@ def register(bot: commands.Bot, db=None, on_message_listener=[]):
             description=f"Frage: {question[:800]}",
             color=discord.Color.blue()
         )
-        bot_message_obj = await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        bot_message_obj = await tl.respond_with_view(ctx, embed, mode="normal")
 
         ai_history = [
-            {"role": "user", "content": "[SYSTEM] Du bist ein hilfreicher Assistent namens CometAI (Beta)."},
-            {"role": "user", "content": question}
+            turn("user", "[SYSTEM] Du bist ein hilfreicher Assistent namens CometAI (Beta)."),
+            turn("user", question)
         ]
 
         loop = asyncio.get_event_loop()
@@ -123,9 +140,6 @@ def register(bot: commands.Bot, db=None, on_message_listener=[]):
 
     # 🔹 Message Listener für Antworten auf Referenzen
     async def message_listener(message: discord.Message):
-        if message.author.bot:
-            return
-
         history = await build_ai_history(message)
         if not history:
             return
@@ -161,7 +175,7 @@ def register(bot: commands.Bot, db=None, on_message_listener=[]):
             description=f"Prompt: {prompt[:800]}",
             color=discord.Color.blue()
         )
-        bot_message_obj = await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        bot_message_obj = await tl.respond_with_view(ctx, embed, mode="normal")
 
         start_time = time.time()
         image_path = await generate_image(prompt)
@@ -178,7 +192,7 @@ def register(bot: commands.Bot, db=None, on_message_listener=[]):
             embed.set_footer(
                 text=f"Bild generiert von Pollinations AI in ~{end_time - start_time:.2f} Sekunden"
             )
-            await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="edit", message_to_edit=bot_message_obj, file=file)
+            await tl.respond_with_view(ctx, embed, mode="edit", message_to_edit=bot_message_obj, file=file)
             os.remove(image_path)
         else:
             embed = discord.Embed(
@@ -186,7 +200,9 @@ def register(bot: commands.Bot, db=None, on_message_listener=[]):
                 description="Das Bild konnte nicht generiert werden.",
                 color=discord.Color.red()
             )
-            await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="edit", message_to_edit=bot_message_obj)
+            await tl.respond_with_view(ctx, embed, mode="edit", message_to_edit=bot_message_obj)
 
-    on_message_listener.append(message_listener)
+    if message_listeners is not None:
+        # nur Antworten auf Bot-Nachrichten; Streaming darf länger dauern als das Standard-Timeout
+        message_listeners.register(message_listener, from_user, reply_to_bot(bot), name="ai.reply", timeout=180)
     bot.add_application_command(ai_group)
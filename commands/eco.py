@@ -2,6 +2,34 @@ import discord
 from discord.ext import commands
 import random
 from modules import translate as tl
+from modules.firebase_db import Abort
+
+
+async def claim_daily(db, server_id: str, user_id: str, current_time: float):
+    """
+    Bucht den täglichen Bonus als eine Transaktion auf dem eco-Knoten, damit parallele
+    Buchungen (z.B. /eco pay) nicht überschrieben werden und nur einmal pro Tag gezahlt wird.
+    Gibt (bonus, streak, kontostand) zurück oder None, wenn der Bonus schon abgeholt wurde.
+    """
+    result = {}
+
+    def claim(eco):
+        eco = dict(eco) if isinstance(eco, dict) else {}
+        last_daily = eco.get("last_daily")
+        if last_daily and current_time - last_daily < 86400:
+            raise Abort()
+        old_streak = eco.get("daily_streak") or 0
+        daily_streak = 1 if not last_daily or current_time - last_daily > 172800 else old_streak + 1
+        daily_bonus = int(random.randint(50, 150) * min(3, 1 + daily_streak * 0.1))
+        eco.update(balance=(eco.get("balance") or 0) + daily_bonus, last_daily=current_time, daily_streak=daily_streak)
+        result.update(bonus=daily_bonus, streak=daily_streak)
+        return eco
+
+    eco = await db.atransact(f"servers/{server_id}/users/{user_id}/eco", claim)
+    if eco is None:
+        return None
+    return result["bonus"], result["streak"], eco["balance"]
+
 
 def register(bot: commands.Bot, db=None, ):
 
@@ -13,24 +41,12 @@ def register(bot: commands.Bot, db=None, ):
     @eco_group.command(name="daily", description="Sammelt deinen täglichen Bonus")
     async def daily(ctx):
         await ctx.defer()
-        user_id = str(ctx.author.id)
-        server_id = str(ctx.guild.id)
-        last_daily = db.get(f"servers/{server_id}/users/{user_id}/eco/last_daily")
-        current_time = discord.utils.utcnow().timestamp()
-
-        if last_daily and current_time - last_daily < 86400:
+        claimed = await claim_daily(db, str(ctx.guild.id), str(ctx.author.id), discord.utils.utcnow().timestamp())
+        if claimed is None:
             embed = discord.Embed(title="❌ Bereits gesammelt", description=":coin: Du hast deinen täglichen Bonus bereits erhalten. Komm später wieder!", color=discord.Color.red())
-            await ctx.respond(embed=embed)
+            await tl.respond_with_view(ctx, embed)
             return
-
-        old_streak = db.get(f"servers/{server_id}/users/{user_id}/eco/daily_streak") or 0
-        daily_streak = 1 if not last_daily or current_time - last_daily > 172800 else old_streak + 1
-
-        daily_bonus = int(random.randint(50, 150) * min(3, 1 + daily_streak * 0.1))
-        balance = db.get(f"servers/{server_id}/users/{user_id}/eco/balance") or 0
-        balance += daily_bonus
-
-        db.update(f"servers/{server_id}/users/{user_id}/eco", {"balance": balance, "last_daily": current_time, "daily_streak": daily_streak})
+        daily_bonus, daily_streak, balance = claimed
 
         embed = discord.Embed(
             title="✅ Täglicher Bonus",
@@ -40,7 +56,6 @@ def register(bot: commands.Bot, db=None, ):
         await tl.respond_with_view(
             ctx,
             embed,
-            preferred_lang="de",
             mode="normal"
         )
 
@@ -50,7 +65,7 @@ def register(bot: commands.Bot, db=None, ):
         member = member or ctx.author
         user_id = str(member.id)
         server_id = str(ctx.guild.id)
-        bal = db.get(f"servers/{server_id}/users/{user_id}/eco/balance") or 0
+        bal = await db.aget(f"servers/{server_id}/users/{user_id}/eco/balance") or 0
 
         embed = discord.Embed(
             title=":coin: Kontostand",
@@ -60,7 +75,6 @@ def register(bot: commands.Bot, db=None, ):
         await tl.respond_with_view(
             ctx,
             embed,
-            preferred_lang="de",
             mode="normal"
         )
 
@@ -69,87 +83,92 @@ def register(bot: commands.Bot, db=None, ):
         await ctx.defer()
         if member.bot or member.id == ctx.author.id or amount <= 0:
             embed = discord.Embed(title="❌ Fehler", description="Ungültige Aktion.", color=discord.Color.red())
-            await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+            await tl.respond_with_view(ctx, embed, mode="normal")
             return
 
         sender_id = str(ctx.author.id)
         receiver_id = str(member.id)
         server_id = str(ctx.guild.id)
 
-        sender_balance = db.get(f"servers/{server_id}/users/{sender_id}/eco/balance") or 0
-        if sender_balance < amount:
+        booking = await db.atransfer(
+            f"servers/{server_id}/users/{sender_id}/eco/balance",
+            f"servers/{server_id}/users/{receiver_id}/eco/balance",
+            amount
+        )
+        if booking is None:
             embed = discord.Embed(title="❌ Fehler", description="Du hast nicht genug Coins.", color=discord.Color.red())
-            await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+            await tl.respond_with_view(ctx, embed, mode="normal")
             return
-
-        receiver_balance = db.get(f"servers/{server_id}/users/{receiver_id}/eco/balance") or 0
-        db.update(f"servers/{server_id}/users/{sender_id}/eco", {"balance": sender_balance - amount})
-        db.update(f"servers/{server_id}/users/{receiver_id}/eco", {"balance": receiver_balance + amount})
+        _, sender_balance = booking
 
         embed = discord.Embed(
             title="✅ Coins gesendet",
-            description=f":coin: {ctx.author.mention} hat **{amount} Coins** an {member.mention} geschickt!\n💰 Neuer Kontostand: **{sender_balance - amount} Coins**",
+            description=f":coin: {ctx.author.mention} hat **{amount} Coins** an {member.mention} geschickt!\n💰 Neuer Kontostand: **{sender_balance} Coins**",
             color=discord.Color.green()
         )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     @eco_group.command(name="steal", description="Versucht, Coins von einem anderen Nutzer zu stehlen")
     async def steal(ctx, member: discord.Member):
         await ctx.defer()
         if member.bot or member.id == ctx.author.id:
             embed = discord.Embed(title="❌ Fehler", description="Ungültige Aktion.", color=discord.Color.red())
-            await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+            await tl.respond_with_view(ctx, embed, mode="normal")
             return
 
         thief_id = str(ctx.author.id)
         victim_id = str(member.id)
         server_id = str(ctx.guild.id)
 
-        thief_balance = db.get(f"servers/{server_id}/users/{thief_id}/eco/balance") or 0
-        victim_balance = db.get(f"servers/{server_id}/users/{victim_id}/eco/balance") or 0
+        thief_path = f"servers/{server_id}/users/{thief_id}/eco/balance"
+        victim_path = f"servers/{server_id}/users/{victim_id}/eco/balance"
+        too_poor = discord.Embed(title="❌ Fehler", description=":coin: Das Opfer hat zu wenig Coins (mindestens 50 benötigt).", color=discord.Color.red())
 
+        victim_balance = await db.aget(victim_path) or 0
         if victim_balance < 50:
-            embed = discord.Embed(title="❌ Fehler", description=":coin: Das Opfer hat zu wenig Coins (mindestens 50 benötigt).", color=discord.Color.red())
-            await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+            await tl.respond_with_view(ctx, too_poor, mode="normal")
             return
 
         if random.random() < 0.4:
-            steal_amount = random.randint(10, min(100, max(10, victim_balance // 10)))
-            steal_amount = min(steal_amount, victim_balance)
-            db.update(f"servers/{server_id}/users/{thief_id}/eco", {"balance": thief_balance + steal_amount})
-            db.update(f"servers/{server_id}/users/{victim_id}/eco", {"balance": victim_balance - steal_amount})
+            def steal_amount(victim_balance):
+                return min(victim_balance, random.randint(10, min(100, max(10, victim_balance // 10))))
+
+            # Kontostand kann sich seit der Prüfung geändert haben -> min_balance in der Transaktion
+            booking = await db.atransfer(victim_path, thief_path, steal_amount, min_balance=50)
+            if booking is None:
+                await tl.respond_with_view(ctx, too_poor, mode="normal")
+                return
+            stolen, _ = booking
             embed = discord.Embed(
                 title="✅ Diebstahl erfolgreich",
-                description=f":coin: {ctx.author.mention} hat **{steal_amount} Coins** von {member.mention} gestohlen!",
+                description=f":coin: {ctx.author.mention} hat **{stolen} Coins** von {member.mention} gestohlen!",
                 color=discord.Color.green()
             )
         else:
-            penalty = min(thief_balance, random.randint(5, 20))
-            db.update(f"servers/{server_id}/users/{thief_id}/eco", {"balance": thief_balance - penalty})
+            old_balance, new_balance = await db.aincrement(thief_path, -random.randint(5, 20), floor=0)
+            penalty = old_balance - new_balance
             embed = discord.Embed(
                 title="❌ Beim Stehlen erwischt",
                 description=f":coin: {ctx.author.mention} wurde erwischt und musste **{penalty} Coins** Strafe zahlen!",
                 color=discord.Color.red()
             )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     @eco_group.command(name="leaderboard", description="Zeigt die Top 10 Nutzer mit dem höchsten Kontostand an")
     async def leaderboard(ctx):
         await ctx.defer()
         server_id = str(ctx.guild.id)
-        users = db.get(f"servers/{server_id}/users") or {}
+        top_10 = await db.aleaderboard(server_id, "eco/balance", 10)
 
-        leaderboard = [(uid, data.get("eco", {}).get("balance", 0) if isinstance(data, dict) else 0) for uid, data in users.items()]
-        leaderboard.sort(key=lambda x: x[1], reverse=True)
-        top_10 = leaderboard[:10]
+        members = await ctx.bot.member_directory.resolve(ctx.guild, [uid for uid, _ in top_10])
 
         embed = discord.Embed(title="🏆 Top 10 Kontostände", color=discord.Color.gold())
         for rank, (uid, balance) in enumerate(top_10, start=1):
-            user = ctx.guild.get_member(int(uid))
+            user = members.get(int(uid))
             if user:
                 embed.add_field(name=f"{rank}. {user.display_name}", value=f":coin: {balance} Coins", inline=False)
 
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     @eco_group.command(name="change-to-points", description="Konvertiert deine Coins in Punkte (2 Coins = 1 Punkt)")
     async def change_to_points(ctx, amount: int):
@@ -159,24 +178,25 @@ def register(bot: commands.Bot, db=None, ):
 
         if amount <= 0:
             embed = discord.Embed(title="❌ Fehler", description="Der Betrag muss positiv sein.", color=discord.Color.red())
-            await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+            await tl.respond_with_view(ctx, embed, mode="normal")
             return
 
-        coin_balance = db.get(f"servers/{server_id}/users/{user_id}/eco/balance") or 0
-        if coin_balance < amount:
+        booking = await db.aconvert(
+            f"servers/{server_id}/users/{user_id}/eco/balance",
+            f"servers/{server_id}/users/{user_id}/points/points",
+            amount, amount // 2
+        )
+        if booking is None:
             embed = discord.Embed(title="❌ Fehler", description=":coin: Du hast nicht genug Coins.", color=discord.Color.red())
-            await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+            await tl.respond_with_view(ctx, embed, mode="normal")
             return
-
-        points_balance = db.get(f"servers/{server_id}/users/{user_id}/points/points") or 0
-        db.update(f"servers/{server_id}/users/{user_id}/eco", {"balance": coin_balance - amount})
-        db.update(f"servers/{server_id}/users/{user_id}/points", {"points": points_balance + amount // 2})
+        coin_balance, points_balance = booking
 
         embed = discord.Embed(
             title="✅ Coins umgewandelt",
-            description=f":coin: Du hast **{amount} Coins** in **{amount // 2} Punkte** umgewandelt!\n💰 Neuer Kontostand: {coin_balance - amount} Coins\n⭐ Neuer Punktestand: {points_balance + amount // 2} Punkte",
+            description=f":coin: Du hast **{amount} Coins** in **{amount // 2} Punkte** umgewandelt!\n💰 Neuer Kontostand: {coin_balance} Coins\n⭐ Neuer Punktestand: {points_balance} Punkte",
             color=discord.Color.green()
         )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     bot.add_application_command(eco_group)
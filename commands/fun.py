@@ -21,7 +21,7 @@ def register(bot: commands.Bot, db=None, ):
             description=f"Das Ergebnis ist: **{result}**",
             color=discord.Color.gold()
         )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     # ---------------- Würfeln ----------------
     @fun_group.command(name="roll", description="Würfelt eine Zahl zwischen 1 und 6")
@@ -33,7 +33,7 @@ def register(bot: commands.Bot, db=None, ):
             description=f"Du hast eine **{result}** gewürfelt!",
             color=discord.Color.blue()
         )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     # ---------------- RPS gegen Bot ----------------
     @fun_group.command(name="rps", description="Spielt Schere, Stein, Papier")
@@ -64,7 +64,7 @@ def register(bot: commands.Bot, db=None, ):
             description=f"Du hast **{choice}** gewählt.\nIch habe **{bot_choice}** gewählt.\n\n{result}",
             color=color
         )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     # ---------------- RPS Online ----------------
     @fun_group.command(name="rps-online", description="Spielt Schere, Stein, Papier gegen einen anderen Nutzer")
@@ -73,20 +73,20 @@ def register(bot: commands.Bot, db=None, ):
     async def rps_online(ctx, opponent: discord.Member = None, eco:int=0):
         await ctx.defer()
         if eco < 0:
-            await tl.respond_with_view(ctx, discord.Embed(title="❌ Fehler", description="Der Einsatz muss positiv sein.", color=discord.Color.red()), preferred_lang="de", mode="normal", ephemeral=True)
+            await tl.respond_with_view(ctx, discord.Embed(title="❌ Fehler", description="Der Einsatz muss positiv sein.", color=discord.Color.red()), mode="normal", ephemeral=True)
             return
         if opponent and opponent.bot:
-            await tl.respond_with_view(ctx, discord.Embed(title="❌ Fehler", description="Du kannst keinen Bot herausfordern!", color=discord.Color.red()), preferred_lang="de", mode="normal", ephemeral=True)
+            await tl.respond_with_view(ctx, discord.Embed(title="❌ Fehler", description="Du kannst keinen Bot herausfordern!", color=discord.Color.red()), mode="normal", ephemeral=True)
             return
         if opponent and opponent == ctx.author:
-            await tl.respond_with_view(ctx, discord.Embed(title="❌ Fehler", description="Du kannst dich nicht selbst herausfordern!", color=discord.Color.red()), preferred_lang="de", mode="normal", ephemeral=True)
+            await tl.respond_with_view(ctx, discord.Embed(title="❌ Fehler", description="Du kannst dich nicht selbst herausfordern!", color=discord.Color.red()), mode="normal", ephemeral=True)
             return
 
         server_id = str(ctx.guild.id)
         user1_id = str(ctx.author.id)
-        bal1 = db.get(f"servers/{server_id}/users/{user1_id}/eco/balance") or 0
+        bal1 = await db.aget(f"servers/{server_id}/users/{user1_id}/eco/balance") or 0
         if bal1 < eco:
-            await tl.respond_with_view(ctx, discord.Embed(title="❌ Fehler", description="Du hast nicht genug Balance für den Einsatz!", color=discord.Color.red()), preferred_lang="de", mode="normal", ephemeral=True)
+            await tl.respond_with_view(ctx, discord.Embed(title="❌ Fehler", description="Du hast nicht genug Balance für den Einsatz!", color=discord.Color.red()), mode="normal", ephemeral=True)
             return
 
         result = {"p1": None, "p2": None}
@@ -111,7 +111,7 @@ def register(bot: commands.Bot, db=None, ):
                     self.embed.description = "❌ Kein Gegner hat sich beteiligt."
                 else:
                     self.embed.description = "❌ Das Spiel wurde aufgrund von Zeitüberschreitung abgebrochen."
-                await tl.respond_with_view(ctx, self.embed, preferred_lang="de", mode="edit", message_to_edit=ctx.interaction.message)
+                await tl.respond_with_view(ctx, self.embed, mode="edit", message_to_edit=ctx.interaction.message)
                 self.stop()
 
             async def check_winner(self, interaction):
@@ -121,7 +121,7 @@ def register(bot: commands.Bot, db=None, ):
                     if p1 == p2:
                         self.embed.title = "🤝 Unentschieden!"
                         self.embed.description = f"Beide haben **{p1}** gewählt.\nEinsatz zurück an beide."
-                        await tl.respond_with_view(ctx, self.embed, preferred_lang="de", mode="edit", message_to_edit=interaction.message)
+                        await tl.respond_with_view(ctx, self.embed, mode="edit", message_to_edit=interaction.message)
                         self.stop()
                         return
 
@@ -134,15 +134,17 @@ def register(bot: commands.Bot, db=None, ):
 
                     if self.eco > 0:
                         win_id, lose_id = str(winner.id), str(loser.id)
-                        bal_w = db.get(f"servers/{server_id}/users/{win_id}/eco/balance") or 0
-                        bal_l = db.get(f"servers/{server_id}/users/{lose_id}/eco/balance") or 0
-                        db.update(f"servers/{server_id}/users/{win_id}/eco", {"balance": bal_w + self.eco})
-                        db.update(f"servers/{server_id}/users/{lose_id}/eco", {"balance": bal_l - self.eco})
+                        # Verlierer zahlt den Einsatz, höchstens aber seinen aktuellen Kontostand
+                        await db.atransfer(
+                            f"servers/{server_id}/users/{lose_id}/eco/balance",
+                            f"servers/{server_id}/users/{win_id}/eco/balance",
+                            lambda balance: min(balance, self.eco)
+                        )
 
                     self.embed.title = f"🏆 {winner.display_name} gewinnt!"
                     self.embed.color = discord.Color.green()
                     self.embed.description = f"**{winner.display_name}** gewinnt mit **{wp}** gegen **{lp}**!\nEinsatz: **{self.eco} Coins**"
-                    await tl.respond_with_view(ctx, self.embed, preferred_lang="de", mode="edit", message_to_edit=interaction.message)
+                    await tl.respond_with_view(ctx, self.embed, mode="edit", message_to_edit=interaction.message)
                     self.stop()
 
             async def interaction_check(self, interaction):
@@ -152,14 +154,14 @@ def register(bot: commands.Bot, db=None, ):
                         self.game_started = True
 
                         user2_id = str(self.player2.id)
-                        bal2 = db.get(f"servers/{server_id}/users/{user2_id}/eco/balance") or 0
+                        bal2 = await db.aget(f"servers/{server_id}/users/{user2_id}/eco/balance") or 0
                         if bal2 < self.eco:
                             text = await tl.translate_text("❌ Du hast nicht genug Balance für den Einsatz!", "de")
                             await interaction.response.send_message(text, ephemeral=True)
                             return False
 
                         self.embed.description = f"{self.player1.mention} fordert {self.player2.mention} zu einer Runde RPS heraus!\nEinsatz: **{self.eco} Coins**"
-                        await tl.respond_with_view(ctx, self.embed, preferred_lang="de", mode="edit", message_to_edit=interaction.message)
+                        await tl.respond_with_view(ctx, self.embed, mode="edit", message_to_edit=interaction.message)
                         return False
                 elif interaction.user not in [self.player1, self.player2]:
                     text = await tl.translate_text("❌ Du bist kein Teilnehmer dieses Spiels!", "de")
@@ -198,11 +200,12 @@ def register(bot: commands.Bot, db=None, ):
                     await self.check_winner(interaction)
 
         view = RPSView(ctx.author, opponent, eco)
+        embed = await tl.localize_embed(view.embed, await tl.guild_language(ctx))
         if opponent:
-            await ctx.respond(embed=view.embed, view=view)
+            await ctx.respond(embed=embed, view=view)
         else:
             text = await tl.translate_text(f"🎮 {ctx.author.mention} möchte eine Runde Schere, Stein, Papier spielen! Klicke auf einen Button, um teilzunehmen!" + (f"\nEinsatz: **{eco} Coins**" if eco > 0 else ""), "de")
-            await ctx.respond(text, embed=view.embed, view=view)
+            await ctx.respond(text, embed=embed, view=view)
 
     @fun_group.command(name="useless-fact", description="Gibt einen nutzlosen Fakt aus")
     async def useless_fact(ctx):
@@ -222,7 +225,7 @@ def register(bot: commands.Bot, db=None, ):
             description=fact,
             color=discord.Color.orange()
         )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     @fun_group.command(name="excuser", description="Gibt eine zufällige Ausrede aus")
     async def excuser(ctx):
@@ -240,7 +243,7 @@ def register(bot: commands.Bot, db=None, ):
             description=excuse,
             color=discord.Color.teal()
         )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     @fun_group.command(name="chucknorris", description="Gibt einen Chuck Norris Witz aus")
     async def chucknorris(ctx):
@@ -258,7 +261,7 @@ def register(bot: commands.Bot, db=None, ):
             description=joke,
             color=discord.Color.dark_grey()
         )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     @fun_group.command(name="dog", description="Gibt ein zufälliges Hundebild aus")
     async def dog(ctx):
@@ -280,7 +283,7 @@ def register(bot: commands.Bot, db=None, ):
         else:
             embed.description = "Fehler beim Abrufen des Bildes."
 
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     @fun_group.command(name="advice", description="Gibt eine zufällige Lebensweisheit aus")
     async def advice(ctx):
@@ -298,7 +301,7 @@ def register(bot: commands.Bot, db=None, ):
             description=advice,
             color=discord.Color.dark_gold()
         )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     @fun_group.command(name="pokemon", description="Gibt Information über ein Pokémon aus")
     async def pokemon(ctx, name: str):
@@ -329,7 +332,7 @@ def register(bot: commands.Bot, db=None, ):
                         color=discord.Color.red()
                     )
 
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     @fun_group.command(name="age", description="Schätzt das Alter einer Person basierend auf dem Namen")
     async def age(ctx, member: discord.Member = None):
@@ -349,7 +352,7 @@ def register(bot: commands.Bot, db=None, ):
             description=f"Die geschätzte Alter von **{target.display_name}** ist **{age}** Jahre.",
             color=discord.Color.purple()
         )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     @fun_group.command(name="gender", description="Schätzt das Geschlecht einer Person basierend auf dem Namen")
     async def gender(ctx, target: str):
@@ -371,7 +374,7 @@ def register(bot: commands.Bot, db=None, ):
             description=text,
             color=discord.Color.purple()
         )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     # Gruppe registrieren
     bot.add_application_command(fun_group)
@@ -1,8 +1,6 @@
 import discord
 from discord.ext import commands
 from discord.ui import View, Button
-from mailtm import Email
-import imgkit
 import io
 from datetime import datetime, timedelta
 from modules import translate as tl
@@ -70,8 +68,9 @@ def register(bot: commands.Bot, db=None, ):
     @u_group.command(name="teampmail", description="Erstellt eine temporäre E-Mail-Adresse")
     async def teampmail(ctx):
         await ctx.defer()
-        text = tl.translate_text("Erstelle Postfach... ⏳", "de")
+        text = await tl.translate_text("Erstelle Postfach... ⏳", "de")
         botmessage = await ctx.respond(text, ephemeral=True)
+        from mailtm import Email  # erst bei Nutzung laden (langsamer Import)
         email = Email()
         email.register()
         emails = []
@@ -95,16 +94,17 @@ def register(bot: commands.Bot, db=None, ):
                     embed.add_field(name=f"{idx}. {subj}", value=f"Von: {sndr}\n{content[:200]}...", inline=False)
                 else:  # HTML als Bild rendern
                     html_data = message['html']
+                    import imgkit
                     img_bytes = imgkit.from_string(html_data, False)
                     file = discord.File(io.BytesIO(img_bytes), filename=f"email_{idx}.png")
                     embed.add_field(name=f"{idx}. {subj}", value=f"Von: {sndr}", inline=False)
                     await botmessage.reply(file=file)
 
             embed.set_footer(text="Nur die letzten 5 E-Mails werden angezeigt.")
-            await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="edit", message_to_edit=botmessage, ephemeral=True)
+            await tl.respond_with_view(ctx, embed, mode="edit", message_to_edit=botmessage, ephemeral=True)
 
         email.start(lambda msg: bot.loop.create_task(mail_listener(msg)), interval=10)
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="edit", message_to_edit=botmessage, ephemeral=True)
+        await tl.respond_with_view(ctx, embed, mode="edit", message_to_edit=botmessage, ephemeral=True)
 
     @u_group.command(name="ping", description="Zeigt die Latenz des Bots an")
     async def ping(ctx):
@@ -138,6 +138,6 @@ def register(bot: commands.Bot, db=None, ):
             description="Countdown endet {ts}(am {tsf}).",
             color=discord.Color.random()
         )
-        await tl.respond_with_view(ctx, embed, preferred_lang="de", mode="normal")
+        await tl.respond_with_view(ctx, embed, mode="normal")
 
     bot.add_application_command(u_group)
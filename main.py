@@ -3,13 +3,17 @@ from discord.ext import commands
 from dotenv import load_dotenv
 import os
 import threading
-from flask import Flask, request, redirect, session
+from flask import Flask, Response, request, redirect, session
 from waitress import serve
+from aiohttp import web
 import asyncio
-import datetime
-import requests
+import concurrent.futures
 from urllib.parse import quote
 import json
+import atexit
+import signal
+import sys
+import traceback
 
 # ----------------------
 # ENV laden
@@ -31,10 +35,51 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-bot = commands.Bot(command_prefix="§", intents=intents)
+# MEMBER_CACHE=low: kein Chunking beim Start, begrenzter Member-Cache (siehe modules/member_cache.py)
+from modules.member_cache import MemberDirectory, configure as member_cache_config
+member_cache_mode = os.getenv("MEMBER_CACHE", "full")
+bot_options = member_cache_config(intents, member_cache_mode)
+
+# Sharding: SHARD_COUNT/SHARD_IDS (z.B. "0-3" oder "0,1") setzt der Cluster-Launcher
+# (modules/cluster.py) pro Worker; AUTO_SHARD=1 lässt Discord die Shard-Anzahl wählen.
+from modules.cluster import shard_config
+
+try:
+    shard_count, shard_ids = shard_config(os.getenv("SHARD_COUNT"), os.getenv("SHARD_IDS"))
+except ValueError as e:
+    sys.exit(f"Ungültige Shard-Konfiguration: {e}")
+sharded = shard_count is not None or os.getenv("AUTO_SHARD", "0") == "1"
+
+class CometBot(commands.AutoShardedBot if sharded else commands.Bot):
+    async def close(self):
+        await super().close()
+        # gepufferte Zähler (Write-Behind) nicht verlieren
+        await firebase_db.aflush()
+
+if sharded:
+    bot = CometBot(command_prefix="§", intents=intents, shard_count=shard_count, shard_ids=shard_ids, **bot_options)
+else:
+    bot = CometBot(command_prefix="§", intents=intents, **bot_options)
+
+# Mitglieder-Auflösung für Leaderboards & Co., für alle Befehlsmodule über bot.member_directory
+member_directory = MemberDirectory(
+    member_cache_mode,
+    max_entries=int(os.getenv("MEMBER_CACHE_SIZE", 5000)),
+    ttl=float(os.getenv("MEMBER_CACHE_TTL", 600))
+)
+bot.member_directory = member_directory
 
 # Datenbankmodul importieren und initialisieren
 from modules import firebase_db as firebase
+from modules import storage
+from modules.guild_settings import GuildSettingsStore
+from modules import metrics
+from modules.bot_stats import BotStats
+from modules.message_listeners import MessageListenerRegistry
+from modules.oauth import DiscordOAuth, OAuthError
+from modules.command_loader import CommandLoader
+from modules.loop_watchdog import LoopWatchdog
+from modules.conversations import ConversationStore
 
 cred_path = '/etc/secrets/db_key.json' 
 db_url = 'https://comet-26ce9-default-rtdb.europe-west1.firebasedatabase.app/'
@@ -44,44 +89,198 @@ user_defaults = {
     "eco": {"balance": 0, "inventory": {"_init": True}, "last_daily": 0, "daily_streak": 0},
     "points": {"points": 0}
 }
-firebase_db = firebase.FirebaseDB(db_url, cred_path, server_defaults, user_defaults)
-
-message_listeners = []
-
-def get_language(guild_id):
-    server_id = str(guild_id)
-    lang = firebase_db.get(f"servers/{server_id}/settings/language") or "de"
-    return lang
-
-# Befehle aus anderen Dateien registrieren
-from commands import moderation, eco, fun, utility, points, ai
-points.register(bot, db=firebase_db)
-utility.register(bot, firebase_db)
-moderation.register(bot, db=firebase_db)
-eco.register(bot, db=firebase_db)
-fun.register(bot, firebase_db)
-ai.register(bot, db=firebase_db, on_message_listener=message_listeners)
+# Speicher-Backend: "firebase" (Standard), "sqlite" (lokal, WAL) oder "memory"
+db_backend = os.getenv("DB_BACKEND", "firebase")
+if db_backend == "sqlite":
+    backend = storage.SQLiteBackend(os.getenv("DB_SQLITE_PATH", "comet.db"))
+elif db_backend == "memory":
+    backend = storage.MemoryBackend()
+else:
+    backend = None
+db_max_concurrency = int(os.getenv("DB_MAX_CONCURRENCY", 8))
+db_batch_size = int(os.getenv("DB_BATCH_SIZE", 500))
+db_cache_size = int(os.getenv("DB_CACHE_SIZE", 10000))
+db_cache_ttl = float(os.getenv("DB_CACHE_TTL", 300))
+firebase_db = firebase.FirebaseDB(
+    db_url, cred_path, server_defaults, user_defaults,
+    max_concurrency=db_max_concurrency, batch_size=db_batch_size,
+    cache_size=db_cache_size, cache_ttl=db_cache_ttl, backend=backend,
+    write_behind=os.getenv("DB_WRITE_BEHIND", "0") == "1",
+    write_behind_staleness=float(os.getenv("DB_WRITE_BEHIND_MS", 1000)) / 1000,
+    write_behind_ops=int(os.getenv("DB_WRITE_BEHIND_OPS", 100)),
+    instrument=os.getenv("DB_METRICS", "1") == "1",
+    # Bytes nur bei jedem n-ten Round-Trip messen (json.dumps ist teuer), 0 = aus
+    instrument_size_sample=int(os.getenv("DB_METRICS_SIZE_SAMPLE", 100))
+)
+atexit.register(firebase_db.close)
+# DB_CACHE_LISTEN=1: Änderungen von außerhalb (z.B. Dashboard) per Listener übernehmen, je Guild dieses
+# Prozesses (siehe ensure_guild_initialized). Aus: User-Cache, Ranglisten und Guild-Einstellungen
+# werden nach DB_CACHE_TTL neu gelesen
+cache_listen = os.getenv("DB_CACHE_LISTEN", "0") == "1"
+
+# Übersetzungen: LRU im Speicher + SQLite-Datei (TRANSLATE_CACHE_PATH leer = nur Speicher)
+from modules import translate
+translate.configure(
+    cache_size=int(os.getenv("TRANSLATE_CACHE_SIZE", 5000)),
+    cache_path=os.getenv("TRANSLATE_CACHE_PATH", "translations.db"),
+    workers=int(os.getenv("TRANSLATE_WORKERS", 4)),
+    max_batches=int(os.getenv("TRANSLATE_MAX_BATCHES", 2)),
+    # Texte außerhalb des Katalogs gesammelt übersetzen (ein Request pro Embed)
+    translate_dynamic=os.getenv("TRANSLATE_DYNAMIC", "0") == "1"
+)
+# Nachrichtenkatalog (locales/*.json): Antworten in der Sprache der Guild ohne Übersetzungs-Request
+translate.load_catalog(os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales"))
+
+# Guild-Einstellungen (Sprache) im Speicher, für alle Befehlsmodule über bot.guild_settings
+guild_settings = GuildSettingsStore(firebase_db, ttl=db_cache_ttl)
+bot.guild_settings = guild_settings
+
+# Daten für /api/stats, werden über die Bot-Events aktuell gehalten
+bot_stats = BotStats(bot, track_members=not member_directory.low_memory)
+
+# on_message-Listener mit Vorfiltern, laufen nebenläufig (siehe modules/message_listeners.py)
+message_listeners = MessageListenerRegistry(default_timeout=float(os.getenv("LISTENER_TIMEOUT", 30)))
+
+# AI-Verläufe pro Bot-Antwort, auf AI_CONTEXT_TOKENS gekürzt (AI_CONVERSATIONS_PATH gesetzt = überleben Neustarts)
+conversations = ConversationStore(
+    max_conversations=int(os.getenv("AI_CONVERSATIONS", 1000)),
+    max_tokens=int(os.getenv("AI_CONTEXT_TOKENS", 3000)),
+    db_path=os.getenv("AI_CONVERSATIONS_PATH") or None
+)
+
+# Befehle aus anderen Dateien registrieren; einzeln neu ladbar über /api/commands
+COMMAND_GROUPS = ["points", "utility", "moderation", "eco", "fun", "ai"]
+command_loader = CommandLoader(bot, db=firebase_db, message_listeners=message_listeners, conversations=conversations)
+for group in COMMAND_GROUPS:
+    command_loader.load_sync(group)
+
+# Laufzeit-Metriken für /api/metrics
+command_stats = metrics.CommandStats()
+command_stats.install_response_hook()
+loop_monitor = metrics.LoopMonitor()
+
+# LOOP_WATCHDOG=1: meldet Callbacks, die den Bot-Loop länger als LOOP_WATCHDOG_MS blockieren (mit Stack)
+loop_watchdog = LoopWatchdog(threshold=float(os.getenv("LOOP_WATCHDOG_MS", 250)) / 1000) if os.getenv("LOOP_WATCHDOG", "0") == "1" else None
+
+@bot.before_invoke
+async def tag_command(ctx):
+    # DB-Zugriffe dem aufrufenden Slash-Command zuordnen
+    metrics.current_command.set(ctx.command.qualified_name)
+    command_stats.start(ctx.interaction.id, ctx.command.qualified_name)
+    if loop_watchdog:
+        loop_watchdog.tag(ctx.command.qualified_name)
+    # Guild im Hintergrund anlegen (chunkt sie), den aufrufenden Nutzer vorab parallel dazu - beides
+    # als Task, damit der Befehl innerhalb der 3s-Frist der Interaction defern kann
+    if start_guild_init(ctx.guild) and isinstance(ctx.author, discord.Member):
+        run_in_background(firebase_db.init_member(ctx.author))
+
+@bot.after_invoke
+async def finish_command(ctx):
+    command_stats.finish(ctx.interaction.id)
+
+@bot.listen("on_application_command_error")
+async def count_command_error(ctx, error):
+    command_stats.error(ctx.command.qualified_name)
+    command_stats.finish(ctx.interaction.id)
+    # eigener Listener ersetzt die Standardausgabe von py-cord
+    print(f"Fehler in /{ctx.command.qualified_name}:", file=sys.stderr)
+    traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
 
 @bot.event
 async def on_ready():
     print(f'Bot ist eingeloggt als {bot.user}')
-    await firebase_db.init(bot)
-    print("Datenbank initialisiert.")
+    loop_monitor.start()
+    if loop_watchdog:
+        loop_watchdog.start()
+    bot_stats.rebuild()
+    if member_directory.low_memory:
+        # kein Chunking beim Start: jede Guild wird erst beim ersten Befehl darin initialisiert
+        print("Datenbank wird pro Guild beim ersten Befehl initialisiert (MEMBER_CACHE=low).")
+    else:
+        guild_ids = {guild.id for guild in bot.guilds}
+        # Befehle während des Starts sollen die Guilds nicht ein zweites Mal anlegen
+        initializing_guilds.update(guild_ids)
+        try:
+            await firebase_db.init(bot)
+            initialized_guilds.update(guild_ids)
+        finally:
+            initializing_guilds.difference_update(guild_ids)
+        if cache_listen:
+            for guild in bot.guilds:
+                await firebase_db.alisten(guild.id)
+        print("Datenbank initialisiert.")
     await bot.change_presence(activity=discord.Game(name="Comet 2.0"))
     print('Bot ist bereit!')
 
+# Guilds, deren Datenbankeinträge angelegt sind; im Low-Memory-Modus erst beim ersten Befehl
+initialized_guilds = set()
+# Guilds, deren Init gerade läuft (on_ready oder start_guild_init)
+initializing_guilds = set()
+guild_init_tasks = set()
+
+def run_in_background(coro):
+    task = asyncio.create_task(coro)
+    guild_init_tasks.add(task)
+    task.add_done_callback(guild_init_tasks.discard)
+
+def start_guild_init(guild) -> bool:
+    """
+    Startet ensure_guild_initialized als Task. False, wenn die Guild schon angelegt ist
+    oder gerade angelegt wird (ohne await dazwischen, daher ohne Lock eindeutig).
+    """
+    if guild is None or guild.id in initialized_guilds or guild.id in initializing_guilds:
+        return False
+    initializing_guilds.add(guild.id)
+    run_in_background(ensure_guild_initialized(guild))
+    return True
+
+async def ensure_guild_initialized(guild):
+    """Legt Server- und Usereinträge einer Guild einmal an (chunkt dafür nur diese Guild)."""
+    try:
+        await firebase_db.init_guild(guild, await member_directory.member_ids(guild))
+        if cache_listen:
+            await firebase_db.alisten(guild.id)
+        initialized_guilds.add(guild.id)
+    finally:
+        initializing_guilds.discard(guild.id)
+
 @bot.event
 async def on_guild_join(guild):
-    await firebase_db.init(bot)
+    bot_stats.guild_join(guild)
+    start_guild_init(guild)
+
+@bot.event
+async def on_guild_remove(guild):
+    bot_stats.guild_remove(guild)
+    member_directory.forget(guild.id)
+    initialized_guilds.discard(guild.id)
+    await firebase_db.aunlisten(guild.id)
+
+@bot.event
+async def on_guild_update(before, after):
+    bot_stats.guild_update(after)
+
+@bot.event
+async def on_guild_channel_create(channel):
+    bot_stats.guild_update(channel.guild)
+
+@bot.event
+async def on_guild_channel_delete(channel):
+    bot_stats.guild_update(channel.guild)
 
 @bot.event
 async def on_member_join(member):
-    await firebase_db.init(bot)
+    bot_stats.member_join(member)
+    await firebase_db.init_member(member)
+
+@bot.event
+async def on_member_remove(member):
+    bot_stats.member_remove(member)
+    member_directory.forget(member.guild.id, member.id)
 
 @bot.event
 async def on_message(message):
-    for listener in message_listeners:
-        await listener(message)
+    message_listeners.dispatch(message)
     await bot.process_commands(message)
 
 
@@ -113,36 +312,6 @@ def restart_bot_thread():
     start_bot_thread()
     return "Bot-Thread neu gestartet!"
 
-def get_bot_stats(bot):
-    stats = {}
-    stats['bot_name'] = str(bot.user)
-    stats['bot_id'] = bot.user.id
-    stats['server_count'] = len(bot.guilds)
-    stats['uptime'] = str(datetime.datetime.utcnow() - bot.uptime) if hasattr(bot, 'uptime') else "unknown"
-
-    guilds = []
-    for guild in bot.guilds:
-        guild_info = {
-            "id": guild.id,
-            "name": guild.name,
-            "member_count": guild.member_count,
-            "text_channels": len(guild.text_channels),
-            "voice_channels": len(guild.voice_channels),
-            "owner_id": guild.owner_id
-        }
-        guilds.append(guild_info)
-    stats['guilds'] = guilds
-
-    unique_users = set()
-    for guild in bot.guilds:
-        for member in guild.members:
-            unique_users.add(member.id)
-    stats['unique_user_count'] = len(unique_users)
-
-    stats['commands'] = [cmd.name for cmd in bot.commands]
-
-    return stats
-
 # ----------------------
 # Flask Web API
 # ----------------------
@@ -166,19 +335,100 @@ def bot_stats_api():
     auth_header = request.headers.get('Authorization')
     if auth_header != f"Bearer {BOT_OWNER_API_KEY}":
         return "Forbidden", 403
-    stats = get_bot_stats(bot)
-    return stats
+    body, etag = bot_stats.snapshot()
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers={"ETag": etag})
+    return Response(body, mimetype="application/json", headers={"ETag": etag})
+
+@app.route('/api/db-stats', methods=['GET'])
+def db_stats_api():
+    auth_header = request.headers.get('Authorization')
+    if auth_header != f"Bearer {BOT_OWNER_API_KEY}":
+        return "Forbidden", 403
+    return {"operations": firebase_db.db_stats(), "cache": firebase_db.cache_stats(), "members": member_directory.stats(), "translations": translate.cache_stats(), "conversations": conversations.stats()}
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_api():
+    auth_header = request.headers.get('Authorization')
+    if auth_header != f"Bearer {BOT_OWNER_API_KEY}":
+        return "Forbidden", 403
+    return Response(metrics.prometheus_text(bot, command_stats, loop_monitor), mimetype="text/plain; version=0.0.4")
+
+@app.route('/api/loop-stalls', methods=['GET'])
+def loop_stalls_api():
+    auth_header = request.headers.get('Authorization')
+    if auth_header != f"Bearer {BOT_OWNER_API_KEY}":
+        return "Forbidden", 403
+    if not loop_watchdog:
+        return "Watchdog ist deaktiviert (LOOP_WATCHDOG=1)", 404
+    return loop_watchdog.reports()
+
+@app.route('/api/commands', methods=['GET'])
+def commands_api():
+    auth_header = request.headers.get('Authorization')
+    if auth_header != f"Bearer {BOT_OWNER_API_KEY}":
+        return "Forbidden", 403
+    return command_loader.status()
+
+@app.route('/api/commands/<name>/<action>', methods=['POST'])
+def command_group_api(name, action):
+    auth_header = request.headers.get('Authorization')
+    if auth_header != f"Bearer {BOT_OWNER_API_KEY}":
+        return "Forbidden", 403
+    if action not in ("load", "unload", "reload"):
+        return "Unknown action", 404
+    if not bot.loop.is_running():
+        return "Bot läuft nicht", 503
+    # im Bot-Loop ausführen, dort leben die Commands und sync_commands
+    future = asyncio.run_coroutine_threadsafe(command_group_action(name, action), bot.loop)
+    try:
+        text, status = future.result(timeout=60)
+    except concurrent.futures.TimeoutError:
+        # nicht im Loop weiterlaufen lassen, sonst landet der Sync nach der Antwort noch
+        future.cancel()
+        print(f"Befehlsgruppe {name}: {action} nach 60s abgebrochen")
+        return {"error": f"{name}: {action} Zeitüberschreitung"}, 504
+    return text, status
+
+async def command_group_action(name, action):
+    """Lädt, entlädt oder ersetzt eine Befehlsgruppe; gibt (Text, HTTP-Status) zurück."""
+    try:
+        await getattr(command_loader, action)(name)
+    except (KeyError, ModuleNotFoundError):
+        return f"Befehlsgruppe {name} nicht gefunden", 404
+    except ValueError as e:
+        return str(e), 409
+    except Exception as e:
+        print(f"Fehler beim {action} von {name}: {e}")
+        return f"Fehler: {e}", 500
+    print(f"Befehlsgruppe {name}: {action} ausgeführt")
+    return f"{name}: {action} ok", 200
 
 # ----------------------
 # Discord OAuth2
 # ----------------------
+# Worker-Threads von waitress (Thread-Modus)
+WEB_THREADS = int(os.getenv("WEB_THREADS", 8))
 SCOPE = ["identify", "email", "guilds"]
-REDIRECT = "https://comet2.onrender.com/login_redirect"
+REDIRECT = os.getenv("OAUTH_REDIRECT", "https://comet2.onrender.com/login_redirect")
+
+# DISCORD_API_BASE/DISCORD_AUTHORIZE_URL erlauben einen lokalen Ersatz für Discords OAuth-Endpunkte
+oauth = DiscordOAuth(
+    CLIENT_ID, CLIENT_SECRET, REDIRECT, SCOPE,
+    api_base=os.getenv("DISCORD_API_BASE", "https://discord.com/api"),
+    authorize_url=os.getenv("DISCORD_AUTHORIZE_URL", "https://discord.com/oauth2/authorize"),
+    max_concurrency=int(os.getenv("OAUTH_MAX_CONCURRENCY", 8)),
+    timeout=float(os.getenv("OAUTH_TIMEOUT", 10)),
+    # waitress-Threads, die gleichzeitig auf einen Login warten dürfen; der Rest bleibt für die API frei
+    sync_slots=max(1, WEB_THREADS // 4)
+)
+
+def cli_login_url(info):
+    return f"cometcli://login?data={quote(json.dumps(info))}"
 
 @app.route('/login/discord')
 def login_discord():
-    url = f"https://discord.com/oauth2/authorize?client_id={CLIENT_ID}&response_type=code&redirect_uri={quote(REDIRECT)}&scope={'+'.join(SCOPE)}"
-    return redirect(url)
+    return redirect(oauth.login_url())
 
 @app.route('/login_redirect')
 def login_redirect():
@@ -186,46 +436,160 @@ def login_redirect():
     if not code:
         return "Error: No Code given", 400
 
-    data = {
-        "client_id": CLIENT_ID,
-        "client_secret": CLIENT_SECRET,
-        "grant_type": "authorization_code",
-        "code": code,
-        "redirect_uri": REDIRECT,
-        "scope": " ".join(SCOPE),
-    }
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    r = requests.post("https://discord.com/api/oauth2/token", data=data, headers=headers)
-    print(r.status_code, r.text, flush=True)  # Debugging
-    r.raise_for_status()
-    tokens = r.json()
+    try:
+        tokens, info = oauth.exchange_code_sync(code)
+    except OAuthError as e:
+        return str(e), e.status
     session['access_token'] = tokens['access_token']
 
-    user_info = requests.get(
-        "https://discord.com/api/users/@me",
-        headers={"Authorization": f"Bearer {tokens['access_token']}"}
-    ).json()
-
-    print(user_info, flush=True)
-
-    info = {
-        "identify": {"id": user_info["id"], "username": user_info['username']},
-        "email": user_info["email"]
-    }
-
     try:
-        data_str = quote(json.dumps(info))
-        return redirect(f"cometcli://login?data={data_str}")
+        return redirect(cli_login_url(info))
     except:
         return info
 
+# ----------------------
+# Async Web API (Single-Loop-Modus)
+# ----------------------
+# Statt Flask/waitress in Threads läuft die API hier mit aiohttp im selben
+# Event-Loop wie der Bot: kein Zugriff auf bot.guilds aus fremden Threads,
+# Neustart und Shutdown sind normale Coroutines.
+bot_task = None
+
+def authorized(req):
+    return req.headers.get('Authorization') == f"Bearer {BOT_OWNER_API_KEY}"
+
+async def restart_bot():
+    global bot_task
+    if bot_task and not bot_task.done():
+        print("Bot wird beendet...")
+        await bot.close()
+        try:
+            await bot_task
+        except Exception as e:
+            print(f"Bot beendet mit Fehler: {e}")
+        print("Bot beendet.")
+    bot.clear()
+    bot_task = asyncio.create_task(bot.start(TOKEN))
+    return "Bot neu gestartet!"
+
+async def web_home(req):
+    return web.Response(text="Comet Bot API is running.")
+
+async def web_restart(req):
+    if not authorized(req):
+        return web.Response(text="Forbidden", status=403)
+    return web.Response(text=await restart_bot())
+
+async def web_stats(req):
+    if not authorized(req):
+        return web.Response(text="Forbidden", status=403)
+    body, etag = bot_stats.snapshot()
+    if req.headers.get('If-None-Match') == etag:
+        return web.Response(status=304, headers={"ETag": etag})
+    return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+async def web_db_stats(req):
+    if not authorized(req):
+        return web.Response(text="Forbidden", status=403)
+    return web.json_response({"operations": firebase_db.db_stats(), "cache": firebase_db.cache_stats(), "members": member_directory.stats(), "translations": translate.cache_stats(), "conversations": conversations.stats()})
+
+async def web_metrics(req):
+    if not authorized(req):
+        return web.Response(text="Forbidden", status=403)
+    return web.Response(text=metrics.prometheus_text(bot, command_stats, loop_monitor), content_type="text/plain")
+
+async def web_loop_stalls(req):
+    if not authorized(req):
+        return web.Response(text="Forbidden", status=403)
+    if not loop_watchdog:
+        return web.Response(text="Watchdog ist deaktiviert (LOOP_WATCHDOG=1)", status=404)
+    return web.json_response(loop_watchdog.reports())
+
+async def web_commands(req):
+    if not authorized(req):
+        return web.Response(text="Forbidden", status=403)
+    return web.json_response(command_loader.status())
+
+async def web_command_group(req):
+    if not authorized(req):
+        return web.Response(text="Forbidden", status=403)
+    action = req.match_info['action']
+    if action not in ("load", "unload", "reload"):
+        return web.Response(text="Unknown action", status=404)
+    text, status = await command_group_action(req.match_info['name'], action)
+    return web.Response(text=text, status=status)
+
+async def web_login_discord(req):
+    raise web.HTTPFound(oauth.login_url())
+
+async def web_login_redirect(req):
+    code = req.query.get("code")
+    if not code:
+        return web.Response(text="Error: No Code given", status=400)
+    try:
+        _, info = await oauth.exchange_code(code)
+    except OAuthError as e:
+        return web.Response(text=str(e), status=e.status)
+    raise web.HTTPFound(cli_login_url(info))
+
+def create_web_app():
+    web_app = web.Application()
+    web_app.add_routes([
+        web.get('/', web_home),
+        web.post('/api/restart', web_restart),
+        web.get('/api/stats', web_stats),
+        web.get('/api/db-stats', web_db_stats),
+        web.get('/api/metrics', web_metrics),
+        web.get('/api/loop-stalls', web_loop_stalls),
+        web.get('/api/commands', web_commands),
+        web.post('/api/commands/{name}/{action}', web_command_group),
+        web.get('/login/discord', web_login_discord),
+        web.get('/login_redirect', web_login_redirect),
+    ])
+    return web_app
+
+async def run_single_loop(port):
+    global bot_task
+    runner = web.AppRunner(create_web_app())
+    await runner.setup()
+    await web.TCPSite(runner, os.getenv("HOST", '0.0.0.0'), port).start()
+    print(f"Web-API läuft auf Port {port} (Single-Loop)")
+    bot_task = asyncio.create_task(bot.start(TOKEN))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await shutdown(runner)
+
+async def shutdown(runner):
+    if not bot.is_closed():
+        await bot.close()
+    await runner.cleanup()
+    await oauth.close()
+    firebase_db.close()
+
 # ----------------------
 # Main
 # ----------------------
 if __name__ == "__main__":
-    # Bot im Hintergrund starten
-    start_bot_thread()
-
-    # Flask im Hauptthread laufen lassen
     port = int(os.getenv("PORT", 10000))
-    serve(app, host='0.0.0.0', port=port)
+
+    # RUNTIME_MODE=single-loop: Bot und Web-API im selben asyncio-Loop
+    if os.getenv("RUNTIME_MODE", "threads") == "single-loop":
+        main_task = bot.loop.create_task(run_single_loop(port))
+        # SIGTERM (z.B. vom Cluster-Supervisor) wie Ctrl+C behandeln
+        try:
+            bot.loop.add_signal_handler(signal.SIGTERM, main_task.cancel)
+        except NotImplementedError:
+            pass
+        try:
+            bot.loop.run_until_complete(main_task)
+        except KeyboardInterrupt:
+            # Ctrl+C: Task abbrechen, damit shutdown() im finally läuft
+            main_task.cancel()
+            bot.loop.run_until_complete(asyncio.gather(main_task, return_exceptions=True))
+    else:
+        # Bot im Hintergrund starten
+        start_bot_thread()
+
+        # Flask im Hauptthread laufen lassen
+        serve(app, host='0.0.0.0', port=port, threads=WEB_THREADS)
@@ -0,0 +1,121 @@
+import datetime
+import hashlib
+import json
+import threading
+from collections import Counter
+
+
+class BotStats:
+    """
+    Hält die Daten für /api/stats aktuell, statt sie bei jeder Anfrage aus
+    bot.guilds neu zu berechnen. Die Bot-Events aktualisieren die Zähler,
+    die Web-API bekommt einen unveränderlichen, gecachten Snapshot (JSON + ETag).
+    track_members=False (MEMBER_CACHE=low): keine ID-Mengen pro Guild, die Zahl der
+    Nutzer ist dann die Summe der member_count-Werte (Nutzer in mehreren Guilds doppelt).
+    """
+
+    def __init__(self, bot, track_members: bool = True):
+        self.bot = bot
+        self.track_members = track_members
+        self.guilds = {}  # guild_id -> guild_info
+        self.members = Counter()  # user_id -> Anzahl gemeinsamer Guilds
+        self.guild_members = {}  # guild_id -> set(user_id), für guild_remove ohne Member-Cache
+        self.lock = threading.Lock()
+        self.cached = None  # (body, etag)
+
+    @staticmethod
+    def _guild_info(guild) -> dict:
+        return {
+            "id": guild.id,
+            "name": guild.name,
+            "member_count": guild.member_count,
+            "text_channels": len(guild.text_channels),
+            "voice_channels": len(guild.voice_channels),
+            "owner_id": guild.owner_id
+        }
+
+    def rebuild(self):
+        """Einmal komplett aufbauen (on_ready)."""
+        guilds = {guild.id: self._guild_info(guild) for guild in self.bot.guilds}
+        guild_members = {
+            guild.id: {member.id for member in guild.members} for guild in self.bot.guilds
+        } if self.track_members else {}
+        members = Counter(user_id for ids in guild_members.values() for user_id in ids)
+        with self.lock:
+            self.guilds = guilds
+            self.guild_members = guild_members
+            self.members = members
+            self.cached = None
+
+    def guild_join(self, guild):
+        with self.lock:
+            self.guilds[guild.id] = self._guild_info(guild)
+            if self.track_members:
+                ids = {member.id for member in guild.members}
+                self.guild_members[guild.id] = ids
+                self.members.update(ids)
+            self.cached = None
+
+    def guild_remove(self, guild):
+        with self.lock:
+            self.guilds.pop(guild.id, None)
+            self.members.subtract(self.guild_members.pop(guild.id, ()))
+            self.members += Counter()  # Einträge <= 0 entfernen
+            self.cached = None
+
+    def guild_update(self, guild):
+        """Name, Owner, Mitglieder- oder Kanalzahl einer Guild haben sich geändert."""
+        with self.lock:
+            if guild.id in self.guilds:
+                self.guilds[guild.id] = self._guild_info(guild)
+                self.cached = None
+
+    def member_join(self, member):
+        if not self.track_members:
+            self.guild_update(member.guild)
+            return
+        with self.lock:
+            ids = self.guild_members.setdefault(member.guild.id, set())
+            if member.id not in ids:
+                ids.add(member.id)
+                self.members[member.id] += 1
+            self.cached = None
+        self.guild_update(member.guild)
+
+    def member_remove(self, member):
+        if not self.track_members:
+            self.guild_update(member.guild)
+            return
+        with self.lock:
+            ids = self.guild_members.get(member.guild.id, set())
+            if member.id in ids:
+                ids.discard(member.id)
+                self.members[member.id] -= 1
+                if self.members[member.id] <= 0:
+                    del self.members[member.id]
+            self.cached = None
+        self.guild_update(member.guild)
+
+    def snapshot(self):
+        """Gibt (json_bytes, etag) zurück; wird nur nach Änderungen neu gebaut."""
+        with self.lock:
+            if self.cached:
+                return self.cached
+            bot = self.bot
+            stats = {
+                "bot_name": str(bot.user),
+                "bot_id": bot.user.id if bot.user else None,
+                "server_count": len(self.guilds),
+                "uptime": str(datetime.datetime.utcnow() - bot.uptime) if hasattr(bot, 'uptime') else "unknown",
+                "guilds": list(self.guilds.values()),
+                "unique_user_count": len(self.members) if self.track_members
+                else sum(guild["member_count"] or 0 for guild in self.guilds.values()),
+                "unique_user_count_approximate": not self.track_members,
+                "commands": [cmd.name for cmd in bot.commands],
+                "shard_ids": sorted(bot.shards) if hasattr(bot, "shards") else None,
+                "shard_count": bot.shard_count,
+            }
+            body = json.dumps(stats).encode()
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            self.cached = (body, etag)
+            return self.cached
@@ -0,0 +1,237 @@
+"""
+Lokaler Cluster-Launcher: startet mehrere Bot-Prozesse (main.py im
+Single-Loop-Modus), die sich die Shards teilen, und stellt davor eine
+gemeinsame Web-API bereit (aggregierte /api/stats, rollierender Neustart).
+
+Start: python -m modules.cluster
+Konfiguration über ENV: CLUSTER_SHARDS, CLUSTER_WORKERS, PORT, CLUSTER_WORKER_PORT
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import aiohttp
+from aiohttp import web
+
+
+def parse_shard_ids(value: str) -> list:
+    """ "0-3,6" -> [0, 1, 2, 3, 6] """
+    ids = []
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            ids.extend(range(int(start), int(end) + 1))
+        else:
+            ids.append(int(part))
+    return ids
+
+
+def shard_config(shard_count: str = None, shard_ids: str = None):
+    """
+    SHARD_COUNT/SHARD_IDS aus der Umgebung prüfen -> (anzahl oder None, ids oder None).
+    Shard-IDs ohne Anzahl oder außerhalb von 0..anzahl-1 sind ein Konfigurationsfehler:
+    Discord würde sonst einfach alle Shards (oder keine) an diesen Prozess geben.
+    """
+    count = int(shard_count) if shard_count else None
+    ids = parse_shard_ids(shard_ids) if shard_ids else None
+    if ids is not None:
+        if count is None:
+            raise ValueError("SHARD_IDS ist gesetzt, aber SHARD_COUNT fehlt")
+        if not ids:
+            raise ValueError("SHARD_IDS enthält keine Shard-ID")
+        invalid = [shard_id for shard_id in ids if not 0 <= shard_id < count]
+        if invalid:
+            raise ValueError(f"SHARD_IDS {invalid} liegen außerhalb von 0..{count - 1} (SHARD_COUNT={count})")
+    return count, ids
+
+
+def split_shards(shard_count: int, workers: int) -> list:
+    """Verteilt die Shards möglichst gleichmäßig als zusammenhängende Bereiche auf die Worker."""
+    workers = max(1, min(workers, shard_count))
+    size, rest = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for i in range(workers):
+        end = start + size + (1 if i < rest else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+class Worker:
+    def __init__(self, index: int, shard_ids: list, shard_count: int, port: int):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.port = port
+        self.process = None
+
+    def start(self):
+        env = dict(os.environ)
+        env.update({
+            "SHARD_COUNT": str(self.shard_count),
+            "SHARD_IDS": ",".join(map(str, self.shard_ids)),
+            "RUNTIME_MODE": "single-loop",
+            "HOST": "127.0.0.1",
+            "PORT": str(self.port),
+        })
+        main = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+        self.process = subprocess.Popen([sys.executable, main], env=env)
+        print(f"Worker {self.index} gestartet (PID {self.process.pid}, Shards {self.shard_ids})")
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    async def stop(self, timeout: float = 30):
+        if not self.alive():
+            return
+        self.process.terminate()
+        try:
+            await asyncio.to_thread(self.process.wait, timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            await asyncio.to_thread(self.process.wait)
+        print(f"Worker {self.index} beendet")
+
+
+class Supervisor:
+    def __init__(self, shard_count: int, workers: int, api_key: str, worker_port: int = 11000):
+        self.api_key = api_key
+        self.workers = [
+            Worker(i, shard_ids, shard_count, worker_port + i)
+            for i, shard_ids in enumerate(split_shards(shard_count, workers))
+        ]
+        self.session = None
+        self.restarting = False
+
+    @property
+    def headers(self):
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    async def fetch_stats(self, worker: Worker):
+        try:
+            async with self.session.get(f"http://127.0.0.1:{worker.port}/api/stats", headers=self.headers) as resp:
+                if resp.status == 200:
+                    return await resp.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        return None
+
+    async def wait_ready(self, worker: Worker, timeout: float = 300):
+        """Wartet, bis der Worker eingeloggt ist und Stats liefert."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            stats = await self.fetch_stats(worker)
+            if stats and stats.get("bot_id"):
+                return True
+            await asyncio.sleep(2)
+        return False
+
+    async def aggregate_stats(self) -> dict:
+        results = await asyncio.gather(*(self.fetch_stats(worker) for worker in self.workers))
+        per_worker = []
+        guilds = []
+        for worker, stats in zip(self.workers, results):
+            per_worker.append({
+                "worker": worker.index,
+                "shard_ids": worker.shard_ids,
+                "alive": worker.alive(),
+                "server_count": stats["server_count"] if stats else None,
+                "unique_user_count": stats["unique_user_count"] if stats else None,
+            })
+            if stats:
+                guilds.extend(stats["guilds"])
+        first = next((stats for stats in results if stats), {})
+        return {
+            "bot_name": first.get("bot_name"),
+            "bot_id": first.get("bot_id"),
+            "server_count": len(guilds),
+            "guilds": guilds,
+            # Summe über die Worker: Nutzer in Guilds verschiedener Shards zählen mehrfach
+            "unique_user_count": sum(w["unique_user_count"] or 0 for w in per_worker),
+            "commands": first.get("commands", []),
+            "workers": per_worker,
+        }
+
+    async def rolling_restart(self):
+        """Startet die Worker nacheinander neu, die übrigen Shards bleiben online."""
+        self.restarting = True
+        try:
+            for worker in self.workers:
+                await worker.stop()
+                worker.start()
+                if not await self.wait_ready(worker):
+                    print(f"Worker {worker.index} wurde nicht rechtzeitig bereit")
+        finally:
+            self.restarting = False
+
+    async def watch(self):
+        """Startet abgestürzte Worker neu."""
+        while True:
+            await asyncio.sleep(10)
+            if self.restarting:
+                continue
+            for worker in self.workers:
+                if not worker.alive():
+                    print(f"Worker {worker.index} ist abgestürzt, starte neu...")
+                    worker.start()
+
+    def authorized(self, req) -> bool:
+        return req.headers.get("Authorization") == f"Bearer {self.api_key}"
+
+    async def web_stats(self, req):
+        if not self.authorized(req):
+            return web.Response(text="Forbidden", status=403)
+        return web.json_response(await self.aggregate_stats())
+
+    async def web_restart(self, req):
+        if not self.authorized(req):
+            return web.Response(text="Forbidden", status=403)
+        if self.restarting:
+            return web.Response(text="Neustart läuft bereits", status=409)
+        asyncio.create_task(self.rolling_restart())
+        return web.Response(text="Rollierender Neustart gestartet!")
+
+    async def run(self, port: int):
+        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))
+        for worker in self.workers:
+            worker.start()
+
+        web_app = web.Application()
+        web_app.add_routes([
+            web.get("/", lambda req: web.Response(text="Comet Cluster API is running.")),
+            web.get("/api/stats", self.web_stats),
+            web.post("/api/restart", self.web_restart),
+        ])
+        runner = web.AppRunner(web_app)
+        await runner.setup()
+        await web.TCPSite(runner, "0.0.0.0", port).start()
+        print(f"Cluster-API läuft auf Port {port} ({len(self.workers)} Worker)")
+        try:
+            await self.watch()
+        finally:
+            await asyncio.gather(*(worker.stop() for worker in self.workers))
+            await runner.cleanup()
+            await self.session.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    try:
+        load_dotenv('secrets/data.env')
+    except Exception:
+        pass
+
+    supervisor = Supervisor(
+        shard_count=int(os.getenv("CLUSTER_SHARDS", 2)),
+        workers=int(os.getenv("CLUSTER_WORKERS", os.cpu_count() or 1)),
+        api_key=os.getenv("BOT_OWNER_API_KEY"),
+        worker_port=int(os.getenv("CLUSTER_WORKER_PORT", 11000)),
+    )
+    try:
+        asyncio.run(supervisor.run(int(os.getenv("PORT", 10000))))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,107 @@
+import importlib
+import inspect
+import sys
+
+
+class CommandLoader:
+    """
+    Macht die Befehlsgruppen aus commands/*.py zu einzeln ladbaren Einheiten.
+    Merkt sich pro Gruppe, welche Slash-Commands und on_message-Listener ihr
+    register() angelegt hat, damit eine Gruppe im laufenden Betrieb entladen
+    oder ausgetauscht werden kann, ohne die Gateway-Verbindung neu aufzubauen.
+    """
+
+    def __init__(self, bot, package: str = "commands", **deps):
+        self.bot = bot
+        self.package = package
+        self.deps = deps  # z.B. db=..., message_listeners=...
+        self.message_listeners = deps.get("message_listeners")
+        self.loaded = {}  # name -> {"commands": [...], "listeners": [...]}
+
+    def _register(self, name: str, module):
+        """Ruft module.register auf und gibt die dabei angelegten Commands/Listener zurück."""
+        accepted = inspect.signature(module.register).parameters
+        kwargs = {key: value for key, value in self.deps.items() if key in accepted}
+        commands_before = {id(cmd) for cmd in self.bot.pending_application_commands}
+        listeners_before = set(self.message_listeners.listeners) if self.message_listeners else set()
+
+        try:
+            module.register(self.bot, **kwargs)
+        finally:
+            # auch bei Fehlern festhalten, was schon angelegt wurde, damit es entfernt werden kann
+            added = [cmd for cmd in self.bot.pending_application_commands if id(cmd) not in commands_before]
+            listeners = set(self.message_listeners.listeners) - listeners_before if self.message_listeners else set()
+            self.loaded[name] = {"commands": added, "listeners": sorted(listeners)}
+
+    def _remove(self, name: str) -> dict:
+        unit = self.loaded.pop(name)
+        for cmd in unit["commands"]:
+            self.bot.remove_application_command(cmd)
+        for listener in unit["listeners"]:
+            self.message_listeners.unregister(listener)
+        return unit
+
+    def _restore(self, name: str, unit: dict, listeners: dict):
+        for cmd in unit["commands"]:
+            self.bot.add_application_command(cmd)
+        if self.message_listeners:
+            self.message_listeners.listeners.update(listeners)
+        self.loaded[name] = unit
+
+    async def _sync(self):
+        # erst nach dem Login nötig; vorher synchronisiert py-cord beim Verbinden selbst
+        if self.bot.is_ready():
+            await self.bot.sync_commands()
+
+    def load_sync(self, name: str):
+        """Lädt eine Gruppe beim Start (vor dem Login, ohne Sync)."""
+        if name in self.loaded:
+            raise ValueError(f"Befehlsgruppe {name} ist bereits geladen")
+        if not name.isidentifier():
+            raise KeyError(name)
+        module = importlib.import_module(f"{self.package}.{name}")
+        try:
+            self._register(name, module)
+        except Exception:
+            self._remove(name)
+            raise
+
+    async def load(self, name: str):
+        self.load_sync(name)
+        await self._sync()
+
+    async def unload(self, name: str):
+        if name not in self.loaded:
+            raise KeyError(name)
+        self._remove(name)
+        await self._sync()
+
+    async def reload(self, name: str):
+        """
+        Führt commands/<name>.py neu aus und ersetzt die Gruppe. Schlägt der Import
+        oder register() fehl, bleibt die alte Version aktiv.
+        """
+        if name not in self.loaded:
+            raise KeyError(name)
+        module = importlib.reload(sys.modules[f"{self.package}.{name}"])
+        listeners = self.message_listeners.listeners if self.message_listeners else {}
+        old_listeners = {key: listeners[key] for key in self.loaded[name]["listeners"] if key in listeners}
+        old = self._remove(name)
+        try:
+            self._register(name, module)
+        except Exception:
+            # halb registrierte neue Version wieder entfernen
+            if name in self.loaded:
+                self._remove(name)
+            self._restore(name, old, old_listeners)
+            raise
+        await self._sync()
+
+    def status(self) -> dict:
+        return {
+            name: {
+                "commands": [cmd.name for cmd in unit["commands"]],
+                "listeners": unit["listeners"],
+            }
+            for name, unit in self.loaded.items()
+        }
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def estimate_tokens(text: str) -> int:
+    """Grobe Schätzung (~4 Zeichen pro Token); reicht für das Budget, ohne Tokenizer des Modells zu laden."""
+    return len(text) // 4 + 1
+
+
+def turn(role: str, content: str) -> dict:
+    return {"role": role, "content": content, "tokens": estimate_tokens(content)}
+
+
+class ConversationStore:
+    """
+    Verlauf der AI-Konversationen, Schlüssel ist die ID der Bot-Nachricht mit der Antwort.
+    Eine Antwort auf diese Nachricht holt den Verlauf mit einem Lookup statt die
+    Referenzkette abzulaufen. Jeder Verlauf wird auf max_tokens gekürzt (älteste
+    Beiträge zuerst, ein führender System-Prompt bleibt), damit der Payload ans Modell
+    begrenzt bleibt. Im Speicher als LRU; mit db_path zusätzlich in SQLite, damit
+    Threads einen Neustart überleben (Einträge älter als max_age werden verworfen).
+    """
+
+    def __init__(self, max_conversations: int = 1000, max_tokens: int = 3000,
+                 db_path: str = None, max_age: float = 7 * 86400):
+        self.max_conversations = max_conversations
+        self.max_tokens = max_tokens
+        self.db_path = db_path
+        self.max_age = max_age
+        self.entries = OrderedDict()  # message_id -> tuple(turns)
+        self.local = threading.local()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            conn = self._conn()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversations ("
+                "message_id INTEGER PRIMARY KEY, turns TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            conn.execute("DELETE FROM conversations WHERE updated < ?", (time.time() - max_age,))
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def trim(self, turns: list) -> tuple:
+        """Älteste Beiträge entfernen, bis das Budget passt; der letzte Beitrag bleibt immer."""
+        # /ai ask schickt den System-Prompt als "[SYSTEM] ..."-Nutzerbeitrag
+        system = [t for t in turns[:1] if t["role"] == "system" or t["content"].startswith("[SYSTEM]")]
+        rest = turns[len(system):]
+        total = sum(t["tokens"] for t in turns)
+        start = 0
+        while total > self.max_tokens and start < len(rest) - 1:
+            total -= rest[start]["tokens"]
+            start += 1
+        # Verlauf soll mit einer Nutzerfrage beginnen, nicht mit einer Antwort
+        while start < len(rest) - 1 and rest[start]["role"] == "assistant":
+            start += 1
+        return tuple(system + rest[start:])
+
+    def _remember(self, message_id: int, turns: tuple):
+        self.entries[message_id] = turns
+        self.entries.move_to_end(message_id)
+        while len(self.entries) > self.max_conversations:
+            self.entries.popitem(last=False)
+
+    async def get(self, message_id: int):
+        """Verlauf bis einschließlich der Bot-Nachricht message_id, None wenn unbekannt."""
+        turns = self.entries.get(message_id)
+        if turns is not None:
+            self.entries.move_to_end(message_id)
+            self.hits += 1
+            return list(turns)
+        if self.db_path:
+            row = await asyncio.to_thread(self._load, message_id)
+            if row is not None:
+                self.disk_hits += 1
+                turns = tuple(json.loads(row))
+                self._remember(message_id, turns)
+                return list(turns)
+        self.misses += 1
+        return None
+
+    def _load(self, message_id: int):
+        row = self._conn().execute(
+            "SELECT turns FROM conversations WHERE message_id = ? AND updated >= ?",
+            (message_id, time.time() - self.max_age)
+        ).fetchone()
+        return row[0] if row else None
+
+    async def put(self, message_ids: list, turns: list) -> tuple:
+        """Speichert den (gekürzten) Verlauf unter allen Nachrichten einer Antwort."""
+        turns = self.trim(turns)
+        for message_id in message_ids:
+            self._remember(message_id, turns)
+        if self.db_path:
+            await asyncio.to_thread(self._save, message_ids, json.dumps(turns))
+        return turns
+
+    def _save(self, message_ids: list, data: str):
+        now = time.time()
+        self._conn().executemany(
+            "INSERT OR REPLACE INTO conversations (message_id, turns, updated) VALUES (?, ?, ?)",
+            [(message_id, data, now) for message_id in message_ids]
+        )
+
+    @staticmethod
+    def payload(turns: list) -> list:
+        """Nachrichten fürs Modell (ohne Token-Zähler)."""
+        return [{"role": t["role"], "content": t["content"]} for t in turns]
+
+    def stats(self) -> dict:
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / total, 4) if total else None,
+        }
@@ -0,0 +1,188 @@
+import asyncio
+import time
+
+import discord
+
+
+class ChannelBudget:
+    """
+    Edit-Budget eines Kanals, gemeinsam für alle Streams darin. Zwischen zwei
+    Edits liegt mindestens `interval`; das Intervall passt sich an:
+    - Rate-Limit-Header (aus 429-Antworten) geben es direkt vor,
+    - langsame Edits (py-cord hat intern auf den Bucket gewartet) vergrößern es,
+    - schnelle Edits verkleinern es langsam wieder bis min_interval.
+    """
+
+    def __init__(self, interval: float = 1.0, min_interval: float = 0.4, max_interval: float = 5.0):
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.next_allowed = 0.0
+        self.last_used = time.monotonic()
+        self.edits = 0
+        self.rate_limited = 0
+
+    async def slot(self):
+        """Wartet auf den nächsten freien Zeitpunkt und reserviert ihn."""
+        now = time.monotonic()
+        start = max(now, self.next_allowed)
+        self.next_allowed = start + self.interval
+        self.last_used = start
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def observe(self, latency: float):
+        self.edits += 1
+        if latency > self.interval:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        else:
+            self.interval = max(self.min_interval, self.interval * 0.9)
+
+    def observe_rate_limit(self, error: discord.HTTPException) -> float:
+        """429: Intervall aus den Headern übernehmen, gibt die Wartezeit zurück."""
+        self.rate_limited += 1
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = float(headers.get("Retry-After") or getattr(error, "retry_after", 0) or self.interval)
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is not None and reset_after is not None:
+            interval = float(reset_after) / max(int(remaining), 1)
+        else:
+            interval = self.interval * 2
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
+        self.next_allowed = max(self.next_allowed, time.monotonic() + retry_after)
+        return retry_after
+
+
+class EditScheduler:
+    """Verteilt die Edit-Budgets pro Kanal; ungenutzte Budgets werden nach idle Sekunden verworfen."""
+
+    def __init__(self, idle: float = 300.0, **budget_options):
+        self.idle = idle
+        self.budget_options = budget_options
+        self.budgets = {}  # channel_id -> ChannelBudget
+
+    def budget(self, channel_id: int) -> ChannelBudget:
+        now = time.monotonic()
+        for key in [key for key, budget in self.budgets.items() if now - budget.last_used > self.idle]:
+            del self.budgets[key]
+        budget = self.budgets.get(channel_id)
+        if budget is None:
+            budget = self.budgets[channel_id] = ChannelBudget(**self.budget_options)
+        return budget
+
+    def stream(self, message: discord.Message, limit: int = 1900) -> "StreamingMessage":
+        return StreamingMessage(message, self.budget(message.channel.id), limit)
+
+    def stats(self) -> dict:
+        return {
+            str(channel_id): {"interval": round(budget.interval, 3), "edits": budget.edits,
+                              "rate_limited": budget.rate_limited}
+            for channel_id, budget in self.budgets.items()
+        }
+
+
+def _split_point(text: str, limit: int) -> int:
+    """Schnittstelle für eine volle Nachricht: letzter Zeilenumbruch, sonst letztes Leerzeichen."""
+    for separator in ("\n", " "):
+        cut = text.rfind(separator, limit // 2, limit)
+        if cut > 0:
+            return cut + 1
+    return limit
+
+
+class StreamingMessage:
+    """
+    Schreibt einen wachsenden Text in eine Discord-Nachricht. Deltas werden nur
+    gesammelt; ein Writer-Task schreibt den aktuellen Stand, sobald das Kanal-Budget
+    es erlaubt (mehrere Deltas -> ein Edit). Wird der Text länger als `limit`, geht
+    es in einer Folgenachricht weiter. close() schreibt garantiert den Endstand.
+    """
+
+    def __init__(self, message: discord.Message, budget: ChannelBudget, limit: int = 1900):
+        self.budget = budget
+        self.limit = limit
+        self.messages = [message]
+        self.sent = [None]  # zuletzt geschriebener Inhalt pro Nachricht
+        self.start = 0  # Position im Text, an der die aktuelle Nachricht beginnt
+        self.text = ""
+        self.dirty = asyncio.Event()
+        self.closed = False
+        self.writer = asyncio.create_task(self._write_loop())
+
+    def append(self, delta: str):
+        if delta:
+            self.text += delta
+            self.dirty.set()
+
+    async def _call(self, action, *args, **kwargs):
+        """Ein API-Aufruf im Kanal-Budget; bei 429 nach der vorgegebenen Wartezeit erneut."""
+        while True:
+            await self.budget.slot()
+            started = time.monotonic()
+            try:
+                result = await action(*args, **kwargs)
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    raise
+                await asyncio.sleep(self.budget.observe_rate_limit(e))
+                continue
+            self.budget.observe(time.monotonic() - started)
+            return result
+
+    async def _flush(self, final: bool = False):
+        segment = self.text[self.start:]
+        while len(segment) > self.limit:
+            # volle Nachricht abschließen, Rest in einer Folgenachricht
+            cut = _split_point(segment, self.limit)
+            await self._edit(segment[:cut], final)
+            rest = segment[cut:]
+            # Folgenachricht gleich an ihrer eigenen Schnittstelle beginnen, sonst kostet das einen Edit
+            first = rest[:_split_point(rest, self.limit)] if len(rest) > self.limit else rest
+            message = await self._call(self.messages[-1].channel.send, first)
+            # erst nach erfolgreichem Senden weiterrücken, sonst würde die volle Nachricht überschrieben
+            self.start += cut
+            self.messages.append(message)
+            self.sent.append(first)
+            segment = self.text[self.start:]
+        if segment.strip():
+            await self._edit(segment, final)
+
+    async def _edit(self, content: str, final: bool = False):
+        if content == self.sent[-1]:
+            return
+        try:
+            await self._call(self.messages[-1].edit, content=content)
+        except Exception as e:
+            if not final:
+                raise
+            # Abschluss: z.B. Nachricht gelöscht - nicht wiederholen, die restlichen Abschnitte trotzdem senden
+            print(f"Stream-Abschluss: Edit fehlgeschlagen, Rest wird weiter gesendet: {e}")
+        self.sent[-1] = content
+
+    async def _write_loop(self):
+        while not self.closed:
+            await self.dirty.wait()
+            self.dirty.clear()
+            try:
+                await self._flush()
+            except discord.HTTPException as e:
+                # Zwischenstände sind verzichtbar, close() schreibt den Endstand
+                print(f"Stream-Edit fehlgeschlagen: {e}")
+
+    async def close(self, attempts: int = 3):
+        """Writer beenden und den vollständigen Text schreiben."""
+        self.closed = True
+        self.dirty.set()
+        try:
+            await self.writer
+        except Exception as e:
+            # Writer ist an einem unerwarteten Fehler gestorben; der Endstand wird trotzdem geschrieben
+            print(f"Stream-Writer fehlgeschlagen: {e}")
+        for attempt in range(attempts):
+            try:
+                await self._flush(final=True)
+                return
+            except discord.HTTPException as e:
+                print(f"Stream-Abschluss fehlgeschlagen ({attempt + 1}/{attempts}): {e}")
+                await asyncio.sleep(self.budget.interval)
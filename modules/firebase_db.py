@@ -1,17 +1,30 @@
-import firebase_admin
-from firebase_admin import credentials, db
 import discord
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from modules.user_cache import UserCache, split_user_path, lookup, assign
+from modules.storage import FirebaseBackend, InstrumentedBackend
+from modules.metrics import DBStats
+from modules.write_behind import WriteBehindBuffer
+from modules.leaderboard import LeaderboardIndex
+
+
+class Abort(Exception):
+    """Bricht eine Transaktion ab, ohne zu schreiben (aus func von transact/atransact werfen)."""
 
 class FirebaseDB:
-    def __init__(self, db_url: str, cred_path: str, server_defaults: dict = None, user_defaults: dict = None):
-        self.cred = credentials.Certificate(cred_path)
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            firebase_admin.initialize_app(self.cred, {
-                'databaseURL': db_url
-            })
-        self.root = db.reference("/")
+    def __init__(self, db_url: str, cred_path: str, server_defaults: dict = None, user_defaults: dict = None, max_concurrency: int = 8, batch_size: int = 500, cache_size: int = 10000, cache_ttl: float = 300.0, backend=None,
+                 write_behind: bool = False, write_behind_staleness: float = 1.0, write_behind_ops: int = 100,
+                 counter_fields: tuple = ("eco/balance", "points/points", "moderation/warnings"),
+                 instrument: bool = True, instrument_size_sample: int = 100):
+        # Speicher-Backend (modules/storage.py), standardmäßig die Firebase Realtime Database
+        self.backend = backend or FirebaseBackend(db_url, cred_path)
+
+        # jeden Round-Trip nach Pfadmuster und Slash-Command zählen
+        self.stats = DBStats() if instrument else None
+        if self.stats:
+            self.backend = InstrumentedBackend(self.backend, self.stats, instrument_size_sample)
         self.server_defaults = server_defaults or {}
         self.user_defaults = user_defaults or {}
 
@@ -21,27 +34,362 @@ class FirebaseDB:
         if not self.user_defaults:
             self.user_defaults = {"_init": True}
 
+        # Blockierende Firebase-Aufrufe laufen in einem begrenzten Thread-Pool,
+        # damit ein langsamer Request nicht den Event-Loop des Bots blockiert
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="firebase")
+
+        # maximale Anzahl Pfade pro Multi-Path-Update
+        self.batch_size = batch_size
+
+        # Cache für Userknoten (servers/{gid}/users/{uid}), cache_size=0 deaktiviert ihn
+        self.cache = UserCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self.listeners = {}  # guild_id -> Listener (siehe listen)
+
+        # Ranglisten (Kontostand/Punkte) pro Guild, werden bei jedem Schreibzugriff nachgeführt
+        self.leaderboards = LeaderboardIndex(cache_ttl)
+
+        # weitere Interessenten an Schreibzugriffen: hook(pfad, wert) mit set-Semantik
+        self.write_hooks = []
+
+        # Write-Behind für Zähler-Felder in Userknoten: Increments werden gesammelt
+        # und spätestens nach write_behind_staleness Sekunden gebündelt geschrieben
+        self.counter_fields = tuple(counter_fields)
+        self.write_behind = WriteBehindBuffer(
+            self._flush_counters, write_behind_staleness, write_behind_ops, batch_size
+        ) if write_behind else None
+
     def set(self, path: str, value):
         # leeres dict vermeiden
         if isinstance(value, dict) and len(value) == 0:
             value = {"_init": True}
-        ref = self.root.child(path)
-        ref.set(value)
+        self._discard_pending(path)
+        self.backend.set(path, value)
+        self._after_write(path, value)
 
     def get(self, path: str):
-        ref = self.root.child(path)
-        return ref.get()
+        if self.write_behind:
+            # offene Increments einrechnen, ohne einen gerade geschriebenen Chunk doppelt zu zählen
+            return self.write_behind.read(path.strip("/"), lambda: self._get(path))
+        return self._get(path)
+
+    def _get(self, path: str):
+        user_path = split_user_path(path) if self.cache else None
+        if user_path:
+            # immer den ganzen Userknoten laden und cachen
+            key, parts = user_path
+            found, node, token = self.cache.get(key)
+            if not found:
+                try:
+                    node = self.backend.get(key)
+                except BaseException:
+                    self.cache.release(key)
+                    raise
+                self.cache.put(key, node, token)
+            value = lookup(node, parts)
+        else:
+            value = self.backend.get(path)
+        return value
+
+    def get_shallow(self, path: str):
+        """Liest nur die Keys eines Knotens (Kindknoten = True, Blätter = Wert)."""
+        return self.backend.get(path, shallow=True)
 
     def update(self, path: str, value: dict):
         # leeres dict vermeiden
         if isinstance(value, dict) and len(value) == 0:
             return
-        ref = self.root.child(path)
-        ref.update(value)
+        for key in value:
+            self._discard_pending(f"{path}/{key}")
+        self.backend.update(path, value)
+        for key, val in value.items():
+            self._after_write(f"{path}/{key}", val)
 
     def delete(self, path: str):
-        ref = self.root.child(path)
-        ref.delete()
+        self._discard_pending(path)
+        self.backend.delete(path)
+        self._after_write(path, None)
+
+    def update_many(self, updates: dict, chunk_size: int = None):
+        """
+        Schreibt viele Pfade ({pfad: wert}) als Multi-Path-Updates auf die Wurzel,
+        mit höchstens chunk_size Pfaden pro Request. Ein Wert von None löscht den Pfad.
+        """
+        chunk_size = chunk_size or self.batch_size
+        items = []
+        for path, value in updates.items():
+            # leeres dict vermeiden
+            if isinstance(value, dict) and len(value) == 0:
+                value = {"_init": True}
+            items.append((path.strip("/"), value))
+
+        for start in range(0, len(items), chunk_size):
+            chunk = dict(items[start:start + chunk_size])
+            for path in chunk:
+                self._discard_pending(path)
+            self.backend.update("", chunk)
+            for path, value in chunk.items():
+                self._after_write(path, value)
+
+    # ----------------------
+    # Ledger (atomare Buchungen)
+    # ----------------------
+    def transact(self, path: str, func):
+        """
+        Führt func(aktueller_wert) -> neuer_wert als Transaktion im Backend aus.
+        Gibt den neuen Wert zurück oder None, wenn func mit Abort abbricht.
+        """
+        # offene Increments müssen vor der Transaktion im Backend stehen
+        if self.write_behind and self.write_behind.has_pending(path.strip("/")):
+            self.write_behind.flush()
+        try:
+            value = self.backend.transaction(path, func)
+        except Abort:
+            return None
+        self._after_write(path, value)
+        return value
+
+    def add(self, path: str, delta):
+        """
+        Addiert delta im Backend (bei Firebase serverseitig, ohne vorher zu lesen).
+        Zähler-Felder landen im Write-Behind-Puffer, falls aktiviert.
+        """
+        path = path.strip("/")
+        self.leaderboards.add(path, delta)
+        if self._buffered(path):
+            self.write_behind.add(path, delta)
+            return
+        user_path = split_user_path(path) if self.cache else None
+        # nicht im Cache addieren: vorher und nachher verwerfen, der nächste Read lädt neu
+        if user_path:
+            self.cache.invalidate(user_path[0])
+        self.backend.increment(path, delta)
+        if user_path:
+            self.cache.invalidate(user_path[0])
+
+    def increment(self, path: str, delta, floor=None):
+        """
+        Erhöht einen Zähler atomar um delta, optional nicht unter floor.
+        Gibt (alter_wert, neuer_wert) zurück.
+        """
+        if floor is None and self._buffered(path):
+            old = self.get(path) or 0
+            self.add(path, delta)
+            return old, old + delta
+        result = {}
+
+        def apply(current):
+            current = current or 0
+            new = current + delta
+            if floor is not None:
+                new = max(floor, new)
+            result["old"] = current
+            return new
+
+        new = self.transact(path, apply)
+        return result["old"], new
+
+    def transfer(self, src: str, dst: str, amount, min_balance=0):
+        """
+        Bucht amount von src nach dst. amount darf auch eine Funktion des
+        Kontostands von src sein. Die Abbuchung ist eine Transaktion, die
+        Gutschrift ein serverseitiges Increment, dadurch gehen bei parallelen
+        Klicks keine Coins verloren oder doppelt.
+        Gibt (betrag, neuer_kontostand_src) zurück oder None, wenn src nicht
+        mindestens max(betrag, min_balance) hat.
+        """
+        moved = {}
+
+        def debit(balance):
+            balance = balance or 0
+            value = amount(balance) if callable(amount) else amount
+            if value <= 0 or balance < max(value, min_balance):
+                raise Abort()
+            moved["amount"] = value
+            return balance - value
+
+        new_src = self.transact(src, debit)
+        if new_src is None:
+            return None
+        self.add(dst, moved["amount"])
+        return moved["amount"], new_src
+
+    def convert(self, src: str, dst: str, amount, gain):
+        """
+        Bucht amount von src ab und gain auf dst. Beide Pfade müssen im selben
+        Userknoten liegen, die Buchung ist eine einzige Transaktion darauf.
+        Gibt (neuer_wert_src, neuer_wert_dst) zurück oder None, wenn src nicht genug hat.
+        """
+        src_split, dst_split = split_user_path(src), split_user_path(dst)
+        if not src_split or not dst_split or src_split[0] != dst_split[0]:
+            raise ValueError("convert() braucht zwei Pfade im selben Userknoten")
+        (key, src_parts), (_, dst_parts) = src_split, dst_split
+        result = {}
+
+        def apply(node):
+            node = node or {}
+            balance = lookup(node, src_parts) or 0
+            if balance < amount:
+                raise Abort()
+            result["src"] = balance - amount
+            result["dst"] = (lookup(node, dst_parts) or 0) + gain
+            node = assign(node, src_parts, result["src"])
+            return assign(node, dst_parts, result["dst"])
+
+        if self.transact(key, apply) is None:
+            return None
+        return result["src"], result["dst"]
+
+    # ----------------------
+    # Ranglisten
+    # ----------------------
+    def leaderboard(self, guild_id, field: str, k: int = 10) -> list:
+        """
+        Gibt die Top k einer Guild für field ("eco/balance" oder "points/points")
+        als [(uid, wert)] zurück. Der Users-Teilbaum wird nur beim ersten Aufruf gelesen.
+        """
+        guild_id = str(guild_id)
+        found, top, token = self.leaderboards.top(guild_id, field, k)
+        if not found:
+            try:
+                users = self.get(f"servers/{guild_id}/users") or {}
+            except BaseException:
+                self.leaderboards.release(guild_id)
+                raise
+            top = self.leaderboards.load(guild_id, users, token)[field].top(k)
+        return top
+
+    # ----------------------
+    # Write-Behind
+    # ----------------------
+    def _buffered(self, path: str) -> bool:
+        if not self.write_behind:
+            return False
+        user_path = split_user_path(path)
+        return bool(user_path) and "/".join(user_path[1]) in self.counter_fields
+
+    def _discard_pending(self, path: str):
+        # ein set/update überschreibt den Wert, ältere Increments sind damit hinfällig
+        if self.write_behind:
+            self.write_behind.discard(path.strip("/"))
+
+    def _flush_counters(self, chunk: dict):
+        """Schreibt einen Chunk des Write-Behind-Puffers (höchstens batch_size Pfade)."""
+        keys = {split_user_path(path)[0] for path in chunk} if self.cache else set()
+        for key in keys:
+            self.cache.invalidate(key)
+        self.backend.increment_many(chunk)
+        for key in keys:
+            self.cache.invalidate(key)
+
+    def flush(self):
+        """Schreibt alle offenen Increments sofort."""
+        if self.write_behind:
+            self.write_behind.flush()
+
+    def close(self):
+        """Beim Beenden: offene Increments schreiben, Flush-Thread und Listener stoppen."""
+        if self.write_behind:
+            self.write_behind.close()
+        for guild_id in list(self.listeners):
+            self.unlisten(guild_id)
+
+    # ----------------------
+    # Cache
+    # ----------------------
+    def _after_write(self, path: str, value):
+        """Überträgt einen Schreibzugriff (set-Semantik) auf den Cache und die Ranglisten."""
+        self.leaderboards.write(path, value)
+        for hook in self.write_hooks:
+            hook(path, value)
+        if not self.cache:
+            return
+        user_path = split_user_path(path)
+        if user_path:
+            self.cache.apply(*user_path, value)
+        else:
+            # Schreibzugriff oberhalb der Userknoten -> betroffene Einträge verwerfen
+            prefix = "/".join(p for p in path.split("/") if p)
+            self.cache.invalidate_prefix(f"{prefix}/" if prefix else "")
+
+    def listen(self, guild_id):
+        """
+        Startet einen Listener auf servers/{guild_id}, damit Änderungen außerhalb des Bots
+        im Cache und bei den write_hooks landen. Nur für Guilds dieses Prozesses: Firebase
+        schickt beim Start (und nach jedem Reconnect) einmal den Teilbaum der Guild.
+        Lokale Backends liefern keine Events.
+        """
+        guild_id = str(guild_id)
+        if guild_id not in self.listeners:
+            self.listeners[guild_id] = self.backend.listen(f"servers/{guild_id}", self._on_event)
+
+    def unlisten(self, guild_id):
+        listener = self.listeners.pop(str(guild_id), None)
+        if listener is not None and hasattr(listener, "close"):
+            listener.close()
+
+    def _on_event(self, event_type: str, path: str, data):
+        if event_type == "patch":
+            for key, value in (data or {}).items():
+                self._after_write(f"{path}/{key}", value)
+        else:
+            self._after_write(path, data)
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats() if self.cache else {}
+
+    def db_stats(self) -> list:
+        return self.stats.snapshot() if self.stats else []
+
+    # ----------------------
+    # Async-API (für Coroutines)
+    # ----------------------
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Kontext mitnehmen, damit z.B. metrics.current_command im Thread-Pool sichtbar ist
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, context.run, functools.partial(func, *args, **kwargs))
+
+    async def aget(self, path: str):
+        return await self._run(self.get, path)
+
+    async def aget_shallow(self, path: str):
+        return await self._run(self.get_shallow, path)
+
+    async def aset(self, path: str, value):
+        await self._run(self.set, path, value)
+
+    async def aupdate(self, path: str, value: dict):
+        await self._run(self.update, path, value)
+
+    async def adelete(self, path: str):
+        await self._run(self.delete, path)
+
+    async def aupdate_many(self, updates: dict, chunk_size: int = None):
+        await self._run(self.update_many, updates, chunk_size)
+
+    async def atransact(self, path: str, func):
+        return await self._run(self.transact, path, func)
+
+    async def aincrement(self, path: str, delta, floor=None):
+        return await self._run(self.increment, path, delta, floor)
+
+    async def atransfer(self, src: str, dst: str, amount, min_balance=0):
+        return await self._run(self.transfer, src, dst, amount, min_balance)
+
+    async def aconvert(self, src: str, dst: str, amount, gain):
+        return await self._run(self.convert, src, dst, amount, gain)
+
+    async def aleaderboard(self, guild_id, field: str, k: int = 10) -> list:
+        return await self._run(self.leaderboard, guild_id, field, k)
+
+    async def aflush(self):
+        await self._run(self.flush)
+
+    async def alisten(self, guild_id):
+        await self._run(self.listen, guild_id)
+
+    async def aunlisten(self, guild_id):
+        await self._run(self.unlisten, guild_id)
 
     async def init(self, bot: discord.Bot):
         """
@@ -49,25 +397,60 @@ class FirebaseDB:
         - Für jede Guild einen Servereintrag
         - Für jeden User in jeder Guild einen Usereintrag
         """
-        print(self.server_defaults)
-        for guild in bot.guilds:
-            server_path = f"servers/{guild.id}"
-            # Server eintragen
-            if not self.get(server_path):
-                self.set(server_path, {"data": self.server_defaults, "users": {"_init": True}})
-            else:
-                self.update(f"{server_path}/data", self.server_defaults)
-
-            for member in guild.members:
-                if member.bot:
+        await asyncio.gather(*(self.init_guild(guild) for guild in bot.guilds))
+
+    async def init_guild(self, guild: discord.Guild, member_ids: dict = None):
+        """
+        Ergänzt fehlende Einträge einer Guild mit wenigen Requests:
+        zwei shallow Reads (data, users), ein gebündelter Write. Der komplette
+        Users-Teilbaum wird nur gelesen, wenn sich die user_defaults geändert haben.
+        member_ids ({user_id: ist_bot}) ersetzt guild.members ohne vollständigen Member-Cache.
+        """
+        server_path = f"servers/{guild.id}"
+        data_keys, user_keys = await asyncio.gather(
+            self.aget_shallow(f"{server_path}/data"),
+            self.aget_shallow(f"{server_path}/users")
+        )
+        data_keys = data_keys or {}
+        user_keys = user_keys or {}
+        updates = {}
+
+        # fehlende Server-Defaults ergänzen (None würde nur löschen)
+        for key, value in self.server_defaults.items():
+            if key not in data_keys and value is not None:
+                updates[f"{server_path}/data/{key}"] = value
+
+        # neue Mitglieder anlegen
+        if member_ids is None:
+            member_ids = {member.id: member.bot for member in guild.members}
+        for user_id, is_bot in member_ids.items():
+            if is_bot or str(user_id) in user_keys:
+                continue
+            updates[f"{server_path}/users/{user_id}"] = self.user_defaults
+
+        # neue Default-Keys bei bestehenden Usern ergänzen, aber nur wenn sich
+        # das Schema seit dem letzten Durchlauf geändert hat
+        schema = ",".join(sorted(self.user_defaults))
+        if data_keys.get("user_schema") != schema:
+            users = await self.aget(f"{server_path}/users") or {}
+            for user_id, current_data in users.items():
+                if not isinstance(current_data, dict):
                     continue
-                user_path = f"{server_path}/users/{member.id}"
-                if not self.get(user_path):
-                    self.set(user_path, self.user_defaults)
-                else:
-                    # neue keys hinzufügen, ohne existierende zu löschen
-                    current_data = self.get(user_path) or {}
-                    for key, value in self.user_defaults.items():
-                        if key not in current_data:
-                            current_data[key] = value
-                    self.set(user_path, current_data)
+                for key, value in self.user_defaults.items():
+                    if key not in current_data:
+                        updates[f"{server_path}/users/{user_id}/{key}"] = value
+            updates[f"{server_path}/data/user_schema"] = schema
+
+        await self.aupdate_many(updates)
+
+    async def init_member(self, member: discord.Member):
+        """Schneller Pfad für on_member_join: legt nur den Eintrag eines Mitglieds an."""
+        if member.bot:
+            return
+        user_path = f"servers/{member.guild.id}/users/{member.id}"
+        current_data = await self.aget(user_path)
+        if not current_data:
+            await self.aset(user_path, self.user_defaults)
+            return
+        missing = {key: value for key, value in self.user_defaults.items() if key not in current_data}
+        await self.aupdate(user_path, missing)
@@ -0,0 +1,66 @@
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class GuildSettings:
+    guild_id: str
+    language: str = "de"
+
+
+class GuildSettingsStore:
+    """
+    Hält die Einstellungen jeder Guild (servers/{id}/settings) im Speicher. Sie
+    werden beim ersten Zugriff gelesen und bei jedem Schreibzugriff des Bots (bzw.
+    über den Firebase-Listener) verworfen; Änderungen von außerhalb ohne Listener
+    kommen spätestens nach ttl Sekunden an.
+    """
+
+    def __init__(self, db, default_language: str = "de", ttl: float = 300.0):
+        self.db = db
+        self.default_language = default_language
+        self.ttl = ttl
+        self.settings = {}  # guild_id -> (ablaufzeit, GuildSettings)
+        self.version = 0  # wird bei jeder Invalidierung erhöht
+        self.lock = threading.Lock()
+        db.write_hooks.append(self._on_write)
+
+    async def _load(self, guild_id: str) -> GuildSettings:
+        # über die Async-API von FirebaseDB, damit der Kontext (Slash-Command für die Metriken) erhalten bleibt
+        settings = await self.db.aget(f"servers/{guild_id}/settings") or {}
+        return GuildSettings(
+            guild_id=guild_id,
+            language=settings.get("language") or self.default_language
+        )
+
+    async def aget(self, guild_id) -> GuildSettings:
+        guild_id = str(guild_id)
+        with self.lock:
+            entry = self.settings.get(guild_id)
+            version = self.version
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        loaded = await self._load(guild_id)
+        with self.lock:
+            # während des Ladens geändert -> Ergebnis nicht cachen
+            if version == self.version:
+                self.settings[guild_id] = (time.monotonic() + self.ttl, loaded)
+        return loaded
+
+    def invalidate(self, guild_id=None):
+        with self.lock:
+            self.version += 1
+            if guild_id is None:
+                self.settings.clear()
+            else:
+                self.settings.pop(str(guild_id), None)
+
+    def _on_write(self, path: str, value):
+        parts = [p for p in path.split("/") if p]
+        if len(parts) < 2:
+            if not parts or parts[0] == "servers":
+                self.invalidate()
+            return
+        if parts[0] == "servers" and (len(parts) == 2 or parts[2] == "settings"):
+            self.invalidate(parts[1])
@@ -0,0 +1,182 @@
+"""
+Nachrichtenkatalog für lokalisierte Antworten.
+
+locales/<sprache>.json enthält pro Schlüssel eine Vorlage, z.B.
+  "eco.balance.text": "{member} hat **{balance} Coins**."
+Die Befehle schreiben weiterhin deutschen Text (Quellsprache). Beim Laden wird jede
+deutsche Vorlage zu einem regulären Ausdruck kompiliert; respond_with_view erkennt
+darüber fertige Embed-Texte, liest die Werte aus und setzt sie in die Vorlage der
+Zielsprache ein - ohne Netzwerkzugriff.
+
+Neue Sprache vorbereiten: python -m modules.i18n seed en fr
+(übersetzt fehlende Schlüssel einmalig mit translate_text und schreibt sie in die
+Datei; danach ist sie eingefroren und kann von Hand korrigiert werden)
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+
+_FIELD = re.compile(r"\{(\w+)\}")
+
+
+def _compile_source(template: str):
+    """Deutsche Vorlage -> Regex mit benannten Gruppen (None bei Vorlagen ohne Felder)."""
+    parts, seen, pos = [], set(), 0
+    for match in _FIELD.finditer(template):
+        parts.append(re.escape(template[pos:match.start()]))
+        name = match.group(1)
+        parts.append(f"(?P={name})" if name in seen else f"(?P<{name}>.+?)")
+        seen.add(name)
+        pos = match.end()
+    if not seen:
+        return None
+    parts.append(re.escape(template[pos:]))
+    return re.compile("".join(parts), re.DOTALL)
+
+
+def _compile_target(template: str) -> list:
+    """Zielvorlage -> Liste aus (Text, Feldname oder None), damit _join() nur noch zusammensetzt."""
+    parts, pos = [], 0
+    for match in _FIELD.finditer(template):
+        parts.append((template[pos:match.start()], match.group(1)))
+        pos = match.end()
+    parts.append((template[pos:], None))
+    return parts
+
+
+class Catalog:
+    def __init__(self, locales_dir: str = "locales", source_lang: str = "de"):
+        self.locales_dir = locales_dir
+        self.source_lang = source_lang
+        self.static = {}  # deutscher Text -> Schlüssel (Vorlagen ohne Felder)
+        self.patterns = []  # [(Regex, Schlüssel)], spezifischste zuerst
+        self.targets = {}  # sprache -> {schlüssel: kompilierte Vorlage}, Quellsprache eingeschlossen
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        source = self._read(self.source_lang)
+        static, patterns = {}, []
+        for key, template in source.items():
+            pattern = _compile_source(template)
+            if pattern is None:
+                static[template] = key
+            else:
+                # längerer fester Text = spezifischer, zuerst probieren
+                patterns.append((len(_FIELD.sub("", template)), pattern, key))
+        patterns.sort(key=lambda item: -item[0])
+
+        targets = {self.source_lang: {key: _compile_target(template) for key, template in source.items()}}
+        for filename in os.listdir(self.locales_dir):
+            lang, ext = os.path.splitext(filename)
+            if ext == ".json" and lang != self.source_lang:
+                targets[lang] = {key: _compile_target(template) for key, template in self._read(lang).items()}
+
+        self.static = static
+        self.patterns = [(pattern, key) for _, pattern, key in patterns]
+        self.targets = targets
+
+    def _read(self, lang: str) -> dict:
+        with open(os.path.join(self.locales_dir, f"{lang}.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    @property
+    def languages(self) -> list:
+        return sorted(self.targets)
+
+    def localize(self, text: str, lang: str) -> str:
+        """Übersetzt einen fertigen deutschen Text anhand des Katalogs; unbekannte Texte bleiben unverändert."""
+        if not text or lang == self.source_lang:
+            return text
+        localized = self.lookup(text, lang)
+        return text if localized is None else localized
+
+    def lookup(self, text: str, lang: str):
+        """Wie localize, aber None, wenn der Text nicht im Katalog steht."""
+        target = self.targets.get(lang)
+        if target is None:
+            return None
+
+        key = self.static.get(text)
+        if key is not None:
+            return self._join(target.get(key), {})
+
+        for pattern, key in self.patterns:
+            match = pattern.fullmatch(text)
+            if match and key in target:
+                # Werte wie "Keiner" oder "Schere" sind selbst Katalogeinträge
+                params = {name: self._static(value, target) for name, value in match.groupdict().items()}
+                return self._join(target[key], params)
+        self.misses += 1
+        return None
+
+    def _static(self, value: str, target: dict) -> str:
+        key = self.static.get(value)
+        return self._join(target.get(key), {}) or value if key else value
+
+    @staticmethod
+    def _join(parts, params: dict):
+        if parts is None:
+            return None
+        return "".join(text + (params.get(field, "") if field else "") for text, field in parts)
+
+    def localize_embed_dict(self, data: dict, lang: str, misses: list = None) -> dict:
+        """
+        Lokalisiert Titel, Beschreibung, Felder, Footer und Autor eines Embed-Dicts.
+        Nicht gefundene Texte bleiben stehen und werden als (Container, Schlüssel) an misses angehängt.
+        """
+        if lang == self.source_lang:
+            return data
+        for container, key in embed_text_slots(data):
+            localized = self.lookup(container[key], lang)
+            if localized is not None:
+                container[key] = localized
+            elif misses is not None:
+                misses.append((container, key))
+        return data
+
+
+def embed_text_slots(data: dict) -> list:
+    """Alle übersetzbaren Texte eines Embed-Dicts als (Container, Schlüssel)."""
+    slots = [(data, key) for key in ("title", "description") if data.get(key)]
+    for field in data.get("fields", []):
+        slots += [(field, key) for key in ("name", "value") if field.get(key)]
+    for section, key in (("footer", "text"), ("author", "name")):
+        part = data.get(section)
+        if part and part.get(key):
+            slots.append((part, key))
+    return slots
+
+
+# ----------------------
+# CLI: fehlende Übersetzungen einmalig erzeugen
+# ----------------------
+async def seed(catalog: Catalog, lang: str) -> int:
+    from modules.translate import translate_text
+
+    path = os.path.join(catalog.locales_dir, f"{lang}.json")
+    existing = catalog._read(lang) if os.path.exists(path) else {}
+    source = catalog._read(catalog.source_lang)
+    missing = [key for key in source if key not in existing]
+    for key in missing:
+        # {feld} als :feld: schützen, translate_text lässt solche Platzhalter unverändert
+        protected = _FIELD.sub(r":\1:", source[key])
+        fields = set(_FIELD.findall(source[key]))
+        translated = await translate_text(protected, lang)
+        existing[key] = re.sub(r":(\w+):", lambda m: f"{{{m.group(1)}}}" if m.group(1) in fields else m.group(0), translated)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(existing, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    return len(missing)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "seed":
+        print("Aufruf: python -m modules.i18n seed <sprache> [<sprache> ...]")
+        sys.exit(1)
+    catalog = Catalog()
+    for lang in sys.argv[2:]:
+        count = asyncio.run(seed(catalog, lang))
+        print(f"{lang}: {count} Schlüssel übersetzt")
@@ -0,0 +1,60 @@
+"""
+Startzeit-Report: importiert main.py (ohne den Bot zu starten) mit `python -X importtime`
+und fasst die Zeiten pro Modul und pro Top-Level-Paket zusammen.
+
+Start: python -m modules.importtime [--top N] [--target main]
+Standardmäßig mit DB_BACKEND=memory und DB_CACHE_LISTEN=0, damit keine Verbindung aufgebaut wird.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(target: str = "main") -> list:
+    """Gibt [(modul, self_us, cumulative_us, tiefe)] in Importreihenfolge zurück."""
+    env = dict(os.environ)
+    env.setdefault("DB_BACKEND", "memory")
+    env.setdefault("DB_CACHE_LISTEN", "0")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=root, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        print(proc.stderr.splitlines()[-1] if proc.stderr else "Import fehlgeschlagen", file=sys.stderr)
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def report(rows: list, top: int = 25):
+    total = sum(self_us for _, self_us, _, _ in rows)
+    print(f"Importzeit gesamt: {total / 1000:.1f} ms ({len(rows)} Module)\n")
+
+    packages = defaultdict(int)
+    for module, self_us, _, _ in rows:
+        packages[module.split(".")[0]] += self_us
+    print(f"{'Paket':<40} {'ms':>9} {'Anteil':>7}")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<40} {self_us / 1000:>9.1f} {self_us / max(total, 1):>7.1%}")
+
+    print(f"\n{'Modul (kumulativ)':<40} {'ms':>9} {'selbst':>9}")
+    for module, self_us, cumulative_us, _ in sorted(rows, key=lambda row: -row[2])[:top]:
+        print(f"{module:<40} {cumulative_us / 1000:>9.1f} {self_us / 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importzeiten beim Start aufschlüsseln")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--target", default="main")
+    args = parser.parse_args()
+    report(measure(args.target), args.top)
@@ -0,0 +1,144 @@
+import bisect
+import threading
+import time
+from modules.user_cache import lookup
+
+FIELDS = ("eco/balance", "points/points")
+
+
+class _Board:
+    """Werte eines Felds einer Guild, zusätzlich absteigend sortiert gehalten."""
+
+    def __init__(self):
+        self.values = {}  # uid -> wert
+        self.order = []  # sortiert nach (-wert, uid)
+
+    def set(self, uid: str, value):
+        old = self.values.pop(uid, None)
+        if old is not None:
+            index = bisect.bisect_left(self.order, (-old, uid))
+            if index < len(self.order) and self.order[index] == (-old, uid):
+                self.order.pop(index)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.values[uid] = value
+            bisect.insort(self.order, (-value, uid))
+
+    def add(self, uid: str, delta):
+        self.set(uid, self.values.get(uid, 0) + delta)
+
+    def top(self, k: int) -> list:
+        return [(uid, -value) for value, uid in self.order[:k]]
+
+
+class LeaderboardIndex:
+    """
+    Top-K-Index pro Guild für Kontostand und Punkte. Wird pro Guild aus dem
+    Users-Teilbaum aufgebaut (nach ttl Sekunden erneut) und dazwischen bei jedem
+    Schreibzugriff von FirebaseDB nachgeführt, sodass eine Rangliste nur noch O(K) kostet.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl  # danach neu aufbauen, damit externe Änderungen ankommen
+        self.boards = {}  # guild_id -> (ablaufzeit, {feld: _Board})
+        # Ladevorgänge: guild_id -> [anzahl laufender Loads, Generation des letzten Schreibzugriffs]
+        self.loading = {}
+        self.generation = 0  # steigt mit jedem Schreibzugriff
+        self.lock = threading.Lock()
+
+    def _boards(self, guild_id: str):
+        entry = self.boards.get(guild_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        self.boards.pop(guild_id, None)
+        return None
+
+    def top(self, guild_id: str, field: str, k: int):
+        """
+        Gibt (gefunden, [(uid, wert)], token) zurück. Ist die Guild nicht (mehr) geladen,
+        muss der Users-Teilbaum mit load(guild_id, users, token) übergeben oder der Load
+        mit release(guild_id) abgebrochen werden.
+        """
+        with self.lock:
+            boards = self._boards(guild_id)
+            if boards is not None:
+                return True, boards[field].top(k), None
+            self.loading.setdefault(guild_id, [0, -1])[0] += 1
+            return False, None, self.generation
+
+    def _finish(self, guild_id: str) -> int:
+        state = self.loading.get(guild_id)
+        if state is None:
+            return -1
+        state[0] -= 1
+        if state[0] <= 0:
+            del self.loading[guild_id]
+        return state[1]
+
+    def load(self, guild_id: str, users: dict, token: int):
+        boards = {field: _Board() for field in FIELDS}
+        for uid, data in (users or {}).items():
+            if not isinstance(data, dict):
+                continue
+            for field in FIELDS:
+                boards[field].set(uid, lookup(data, field.split("/")))
+        with self.lock:
+            # seit token geschrieben -> Stand ist evtl. veraltet, beim nächsten Mal neu laden
+            if self._finish(guild_id) <= token:
+                current = self._boards(guild_id)
+                if current is None:
+                    self.boards[guild_id] = (time.monotonic() + self.ttl, boards)
+                else:
+                    boards = current
+        return boards
+
+    def release(self, guild_id: str):
+        with self.lock:
+            self._finish(guild_id)
+
+    def _touch(self, *guild_ids):
+        self.generation += 1
+        for guild_id in guild_ids:
+            if guild_id in self.loading:
+                self.loading[guild_id][1] = self.generation
+
+    def write(self, path: str, value):
+        """Überträgt einen Schreibzugriff mit set-Semantik."""
+        parts = [p for p in path.split("/") if p]
+        with self.lock:
+            if len(parts) < 2:
+                if not parts or parts[0] == "servers":
+                    self._touch(*self.loading)
+                    self.boards.clear()
+                return
+            if parts[0] != "servers":
+                return
+            guild_id = parts[1]
+            if len(parts) < 4:
+                # ganze Guild oder ganzer Users-Knoten überschrieben -> neu laden
+                if len(parts) == 2 or parts[2] == "users":
+                    self._touch(guild_id)
+                    self.boards.pop(guild_id, None)
+                return
+            if parts[2] != "users":
+                return
+            self._touch(guild_id)
+            boards = self._boards(guild_id)
+            if boards is None:
+                return
+            uid, rest = parts[3], parts[4:]
+            for field in FIELDS:
+                field_parts = field.split("/")
+                if rest == field_parts[:len(rest)]:
+                    boards[field].set(uid, lookup(value, field_parts[len(rest):]))
+
+    def add(self, path: str, delta):
+        """Überträgt ein Increment auf ein Feld."""
+        parts = [p for p in path.split("/") if p]
+        field = "/".join(parts[4:])
+        if len(parts) < 4 or parts[0] != "servers" or parts[2] != "users" or field not in FIELDS:
+            return
+        with self.lock:
+            self._touch(parts[1])
+            boards = self._boards(parts[1])
+            if boards is not None:
+                boards[field].add(parts[3], delta)
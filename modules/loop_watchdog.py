@@ -0,0 +1,107 @@
+import asyncio
+import datetime
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+
+from modules.metrics import current_command
+
+
+class LoopWatchdog:
+    """
+    Erkennt blockierende Callbacks im Bot-Loop. Der Loop setzt alle `interval`
+    Sekunden einen Heartbeat; ein Monitor-Thread prüft ihn. Bleibt er länger als
+    `threshold` aus, wird der Stack des Loop-Threads samt aktuellem Task und
+    Slash-Command festgehalten, geloggt und über reports() bereitgestellt.
+    """
+
+    def __init__(self, threshold: float = 0.25, interval: float = 0.05, max_reports: int = 50):
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = deque(maxlen=max_reports)
+        self.total = 0
+        self.beat = time.monotonic()
+        self.loop = None
+        self.loop_thread = None
+        self.thread = None
+        self.lock = threading.Lock()
+        # Task -> Command; für Python < 3.12, wo der Task-Kontext von außen nicht lesbar ist
+        self.task_commands = weakref.WeakKeyDictionary()
+
+    def tag(self, command: str):
+        """Aus dem before_invoke-Hook: merkt sich den Command des aktuellen Tasks."""
+        task = asyncio.current_task()
+        if task is not None:
+            self.task_commands[task] = command
+
+    def start(self):
+        """Im laufenden Bot-Loop aufrufen (z.B. on_ready); mehrfacher Aufruf ist harmlos."""
+        loop = asyncio.get_running_loop()
+        if self.loop is loop:
+            return
+        self.loop = loop
+        self.loop_thread = threading.get_ident()
+        self.beat = time.monotonic()
+        loop.call_soon(self._heartbeat, loop)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+            self.thread.start()
+
+    def _heartbeat(self, loop):
+        if loop is not self.loop or loop.is_closed():
+            return
+        self.beat = time.monotonic()
+        loop.call_later(self.interval, self._heartbeat, loop)
+
+    def _active(self):
+        """Aktueller Task des Loops und dessen Slash-Command (aus dem Task-Kontext)."""
+        task = asyncio.current_task(self.loop) if self.loop else None
+        if task is None:
+            return None, None
+        if hasattr(task, "get_context"):
+            command = task.get_context().get(current_command)
+        else:
+            command = self.task_commands.get(task)
+        return task.get_name(), command
+
+    def _monitor(self):
+        stall = None
+        while True:
+            time.sleep(self.interval)
+            beat = self.beat
+            blocked = time.monotonic() - beat
+            if stall is not None and stall["beat"] != beat:
+                # Loop läuft wieder: Dauer nachtragen
+                stall["duration"] = round(beat - stall["beat"], 3)
+                print(f"Event-Loop war {stall['duration']}s blockiert (Command: {stall['command'] or '-'})")
+                stall = None
+            if stall is None and blocked > self.threshold:
+                stall = self._capture(beat, blocked)
+
+    def _capture(self, beat: float, blocked: float) -> dict:
+        frame = sys._current_frames().get(self.loop_thread)
+        stack = traceback.format_stack(frame) if frame is not None else []
+        task, command = self._active()
+        stall = {
+            "time": datetime.datetime.utcnow().isoformat(),
+            "beat": beat,
+            "blocked_at_capture": round(blocked, 3),
+            "duration": None,  # wird nach dem Ende des Stalls gesetzt
+            "task": task,
+            "command": command,
+            "stack": [line.rstrip() for line in stack],
+        }
+        with self.lock:
+            self.stalls.append(stall)
+            self.total += 1
+        location = stack[-1].strip().splitlines()[0] if stack else "?"
+        print(f"Event-Loop blockiert seit {blocked:.3f}s (Command: {command or '-'}, Task: {task or '-'}) bei {location}")
+        return stall
+
+    def reports(self) -> dict:
+        with self.lock:
+            stalls = [{key: value for key, value in stall.items() if key != "beat"} for stall in self.stalls]
+        return {"threshold": self.threshold, "total": self.total, "stalls": stalls}
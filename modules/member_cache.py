@@ -0,0 +1,191 @@
+"""
+Speicherarmer Umgang mit Guild-Mitgliedern.
+
+MEMBER_CACHE=full (Standard): discord.py hält alle Mitglieder im Cache (Chunking beim Start).
+MEMBER_CACHE=low: kein Chunking beim Start, die Library cached nur noch Mitglieder in
+Voice-Kanälen. Mitgliederlisten werden pro Guild erst bei Bedarf geholt (erster Befehl
+oder Beitritt, siehe main.py, ohne sie zu cachen),
+einzelne Mitglieder (z.B. für Leaderboards) gebündelt per query_members nachgeladen und
+in einem begrenzten LRU gehalten.
+
+Benchmark: python -m modules.member_cache  (RSS pro 10k Mitglieder in beiden Modi)
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+
+import discord
+
+# Discord erlaubt höchstens 100 user_ids pro Request Guild Members
+QUERY_BATCH = 100
+
+
+def configure(intents: discord.Intents, mode: str) -> dict:
+    """Zusätzliche Bot-Argumente für den gewählten Modus."""
+    if mode != "low":
+        return {}
+    flags = discord.MemberCacheFlags.from_intents(intents)
+    flags.joined = False  # neue Mitglieder nicht dauerhaft cachen
+    return {"chunk_guilds_at_startup": False, "member_cache_flags": flags}
+
+
+class MemberDirectory:
+    """
+    Auflösung von User-IDs zu Mitgliedern. Nutzt zuerst den Cache der Library,
+    dann einen eigenen LRU (max_entries, ttl) und lädt den Rest gebündelt nach.
+    Nicht gefundene IDs (Guild verlassen) werden ebenfalls kurz gemerkt.
+    """
+
+    def __init__(self, mode: str = "full", max_entries: int = 5000, ttl: float = 600.0):
+        self.low_memory = mode == "low"
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # (guild_id, user_id) -> (Member oder None, expires)
+        self.chunk_locks = {}  # guild_id -> Lock, damit eine Guild nicht parallel gechunkt wird
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, guild_id: int, user_id: int):
+        key = (guild_id, user_id)
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        member, expires = entry
+        if expires < time.monotonic():
+            del self.entries[key]
+            return False, None
+        self.entries.move_to_end(key)
+        return True, member
+
+    def _put(self, guild_id: int, user_id: int, member):
+        self.entries[(guild_id, user_id)] = (member, time.monotonic() + self.ttl)
+        self.entries.move_to_end((guild_id, user_id))
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def forget(self, guild_id: int, user_id: int = None):
+        if user_id is not None:
+            self.entries.pop((guild_id, user_id), None)
+            return
+        for key in [key for key in self.entries if key[0] == guild_id]:
+            del self.entries[key]
+        self.chunk_locks.pop(guild_id, None)
+
+    async def resolve(self, guild: discord.Guild, user_ids) -> dict:
+        """Gibt {user_id: Member} für alle noch vorhandenen Mitglieder zurück."""
+        found, missing = {}, []
+        for user_id in map(int, user_ids):
+            member = guild.get_member(user_id)
+            if member is None:
+                cached, member = self._get(guild.id, user_id)
+                if not cached:
+                    missing.append(user_id)
+                    continue
+            self.hits += 1
+            if member is not None:
+                found[user_id] = member
+
+        # vollständig gechunkte Guild: was nicht im Cache ist, ist nicht (mehr) Mitglied
+        if missing and not guild.chunked:
+            self.misses += len(missing)
+            for start in range(0, len(missing), QUERY_BATCH):
+                batch = missing[start:start + QUERY_BATCH]
+                try:
+                    members = await guild.query_members(user_ids=batch, limit=len(batch), cache=False)
+                except (asyncio.TimeoutError, discord.HTTPException) as e:
+                    print(f"Mitglieder von {guild.id} konnten nicht geladen werden: {e}")
+                    continue
+                by_id = {member.id: member for member in members}
+                for user_id in batch:
+                    member = by_id.get(user_id)
+                    self._put(guild.id, user_id, member)
+                    if member is not None:
+                        found[user_id] = member
+        return found
+
+    async def member_ids(self, guild: discord.Guild) -> dict:
+        """
+        Alle Mitglieder einer Guild als {user_id: ist_bot}. Im Low-Memory-Modus wird
+        die Guild dafür einmal gechunkt, ohne die Member-Objekte zu behalten.
+        """
+        if guild.chunked or not self.low_memory:
+            return {member.id: member.bot for member in guild.members}
+        lock = self.chunk_locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            members = await guild.chunk(cache=False)
+            return {member.id: member.bot for member in members}
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "mode": "low" if self.low_memory else "full",
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+# ----------------------
+# Benchmark
+# ----------------------
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    # ru_maxrss ist der Höchstwert (Linux: KiB, macOS: Bytes)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+async def _measure(mode: str, token: str) -> dict:
+    intents = discord.Intents.default()
+    intents.members = True
+    bot = discord.Bot(intents=intents, **configure(intents, mode))
+    result = {}
+    before = rss_bytes()
+
+    @bot.event
+    async def on_ready():
+        # wie on_ready im Bot: im Low-Memory-Modus wird nichts gechunkt
+        members = sum(guild.member_count or 0 for guild in bot.guilds)
+        result.update({
+            "mode": mode,
+            "guilds": len(bot.guilds),
+            "members": members,
+            "cached_members": sum(len(guild.members) for guild in bot.guilds),
+            "rss_mb": round(rss_bytes() / 2**20, 1),
+            "rss_per_10k_mb": round((rss_bytes() - before) / max(members, 1) * 10000 / 2**20, 2),
+        })
+        await bot.close()
+
+    await bot.start(token)
+    return result
+
+
+def benchmark(token: str):
+    """Misst jeden Modus in einem eigenen Prozess, damit sich die Heaps nicht beeinflussen."""
+    for mode in ("full", "low"):
+        subprocess.run([sys.executable, "-m", "modules.member_cache", "--measure", mode], env=dict(os.environ, DISCORD_TOKEN=token))
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    try:
+        load_dotenv('secrets/data.env')
+    except Exception:
+        pass
+    token = os.getenv("DISCORD_TOKEN")
+    if len(sys.argv) == 3 and sys.argv[1] == "--measure":
+        print(asyncio.run(_measure(sys.argv[2], token)))
+    else:
+        benchmark(token)
@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+
+# ----------------------
+# Prädikate: billige, synchrone Prüfungen auf der Nachricht
+# ----------------------
+def from_user(message) -> bool:
+    """Nachricht stammt nicht von einem Bot."""
+    return not message.author.bot
+
+
+def guild_only(message) -> bool:
+    return message.guild is not None
+
+
+def reply_to_bot(bot):
+    """Nachricht ist eine Antwort auf eine Nachricht dieses Bots."""
+    def check(message) -> bool:
+        reference = message.reference
+        if reference is None or bot.user is None:
+            return False
+        resolved = reference.resolved or reference.cached_message
+        author = getattr(resolved, "author", None)
+        return author is not None and author.id == bot.user.id
+    return check
+
+
+class MessageListener:
+    def __init__(self, name: str, callback, predicates: tuple, timeout: float):
+        self.name = name
+        self.callback = callback
+        self.predicates = predicates
+        self.timeout = timeout
+        self.matched = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_time = 0.0
+
+    def matches(self, message) -> bool:
+        return all(predicate(message) for predicate in self.predicates)
+
+
+class MessageListenerRegistry:
+    """
+    on_message-Listener mit Vorfiltern. dispatch() prüft für jede Nachricht nur die
+    Prädikate und startet die passenden Listener nebenläufig als Tasks - jeder mit
+    eigenem Timeout, Fehler eines Listeners betreffen die anderen nicht.
+    """
+
+    def __init__(self, default_timeout: float = 30.0):
+        self.default_timeout = default_timeout
+        self.listeners = {}  # name -> MessageListener
+        self.tasks = set()
+
+    def register(self, callback, *predicates, name: str = None, timeout: float = None) -> MessageListener:
+        name = name or f"{callback.__module__}.{callback.__qualname__}"
+        listener = MessageListener(name, callback, predicates, timeout or self.default_timeout)
+        self.listeners[name] = listener
+        return listener
+
+    def listener(self, *predicates, name: str = None, timeout: float = None):
+        """Decorator-Variante von register()."""
+        def decorator(callback):
+            self.register(callback, *predicates, name=name, timeout=timeout)
+            return callback
+        return decorator
+
+    def unregister(self, name: str):
+        self.listeners.pop(name, None)
+
+    def dispatch(self, message):
+        for listener in list(self.listeners.values()):
+            try:
+                if not listener.matches(message):
+                    continue
+            except Exception as e:
+                listener.errors += 1
+                print(f"Fehler im Filter von Listener {listener.name}: {e}")
+                continue
+            listener.matched += 1
+            task = asyncio.create_task(self._run(listener, message))
+            # Referenz halten, sonst kann der Task vorzeitig eingesammelt werden
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, listener: MessageListener, message):
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(listener.callback(message), listener.timeout)
+        except asyncio.TimeoutError:
+            listener.timeouts += 1
+            print(f"Listener {listener.name} hat das Timeout ({listener.timeout}s) überschritten")
+        except Exception as e:
+            listener.errors += 1
+            print(f"Fehler in Listener {listener.name}: {e}")
+        finally:
+            listener.total_time += time.perf_counter() - start
+
+    def stats(self) -> list:
+        return [
+            {
+                "name": listener.name,
+                "matched": listener.matched,
+                "errors": listener.errors,
+                "timeouts": listener.timeouts,
+                "total_time": round(listener.total_time, 3),
+            }
+            for listener in self.listeners.values()
+        ]
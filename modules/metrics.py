@@ -0,0 +1,251 @@
+import asyncio
+import math
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+# Name des gerade ausgeführten Slash-Commands (wird im before_invoke-Hook gesetzt)
+current_command = ContextVar("current_command", default=None)
+
+# Standard-Buckets für Latenzen in Sekunden
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ID_SEGMENT = re.compile(r"^\d+$")
+
+
+def normalize_path(path: str) -> str:
+    """Macht aus einem DB-Pfad ein Muster, z.B. servers/1/users/2/eco -> servers/*/users/*/eco."""
+    parts = [p for p in path.split("/") if p]
+    return "/".join("*" if _ID_SEGMENT.match(p) else p for p in parts) or "/"
+
+
+class Histogram:
+    """Einfaches Histogramm mit festen Buckets (kumulativ wie bei Prometheus)."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "buckets": {str(bound): n for bound, n in zip(self.buckets, self.counts)},
+        }
+
+
+class DBStats:
+    """Zählt Datenbank-Requests nach (Operation, Pfadmuster, Slash-Command)."""
+
+    def __init__(self):
+        self.entries = {}  # (op, muster, command) -> {"count", "bytes", "latency"}
+        self.lock = threading.Lock()
+
+    def record(self, op: str, pattern: str, seconds: float, nbytes: int):
+        key = (op, pattern, current_command.get() or "-")
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = {"count": 0, "bytes": 0, "latency": Histogram()}
+            entry["count"] += 1
+            entry["bytes"] += nbytes
+            entry["latency"].observe(seconds)
+
+    def snapshot(self) -> list:
+        with self.lock:
+            return [
+                {
+                    "op": op,
+                    "path": pattern,
+                    "command": command,
+                    "count": entry["count"],
+                    "bytes": entry["bytes"],
+                    "latency": entry["latency"].snapshot(),
+                }
+                for (op, pattern, command), entry in sorted(self.entries.items())
+            ]
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> list:
+    lines = [
+        f'{name}_bucket{{{labels},le="{bound}"}} {n}'
+        for bound, n in zip(histogram.buckets, histogram.counts)
+    ]
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+class CommandStats:
+    """
+    Aufrufe, Fehler und Latenzen pro Slash-Command. Wird von den Hooks in main.py
+    gefüttert (before_invoke / after_invoke / on_application_command_error),
+    die erste Antwort über install_response_hook().
+    """
+
+    def __init__(self):
+        self.commands = {}  # name -> {"invocations", "errors", "first_response", "completion"}
+        self.in_flight = {}  # interaction_id -> (name, start)
+        self.lock = threading.Lock()
+
+    def _entry(self, name: str) -> dict:
+        entry = self.commands.get(name)
+        if entry is None:
+            entry = self.commands[name] = {
+                "invocations": 0, "errors": 0,
+                "first_response": Histogram(), "completion": Histogram(),
+            }
+        return entry
+
+    def start(self, interaction_id, name: str):
+        with self.lock:
+            self._entry(name)["invocations"] += 1
+            self.in_flight[interaction_id] = [name, time.perf_counter(), False]
+
+    def responded(self, interaction_id):
+        """Erste Antwort (defer, send_message, ...) auf eine laufende Interaction."""
+        with self.lock:
+            running = self.in_flight.get(interaction_id)
+            if running is None or running[2]:
+                return
+            running[2] = True
+            self._entry(running[0])["first_response"].observe(time.perf_counter() - running[1])
+
+    def finish(self, interaction_id):
+        with self.lock:
+            running = self.in_flight.pop(interaction_id, None)
+            if running is not None:
+                self._entry(running[0])["completion"].observe(time.perf_counter() - running[1])
+
+    def error(self, name: str):
+        with self.lock:
+            self._entry(name)["errors"] += 1
+
+    def install_response_hook(self):
+        """Misst die erste Antwort, ohne die einzelnen Befehle anzupassen."""
+        import discord
+        stats = self
+        for method in ("defer", "send_message", "send_modal", "edit_message"):
+            original = getattr(discord.InteractionResponse, method, None)
+            if original is None or getattr(original, "_metrics_hook", False):
+                continue
+
+            def wrap(original):
+                async def wrapper(response, *args, **kwargs):
+                    result = await original(response, *args, **kwargs)
+                    stats.responded(response._parent.id)
+                    return result
+                wrapper._metrics_hook = True
+                wrapper.__name__ = original.__name__
+                wrapper.__doc__ = original.__doc__
+                return wrapper
+
+            setattr(discord.InteractionResponse, method, wrap(original))
+
+    def prometheus(self) -> list:
+        lines = [
+            "# HELP comet_command_invocations_total Slash-Command-Aufrufe",
+            "# TYPE comet_command_invocations_total counter",
+        ]
+        with self.lock:
+            items = sorted(self.commands.items())
+            in_flight = len(self.in_flight)
+            lines += [f'comet_command_invocations_total{{command="{_label(n)}"}} {e["invocations"]}' for n, e in items]
+            lines += [
+                "# HELP comet_command_errors_total Fehlgeschlagene Slash-Commands",
+                "# TYPE comet_command_errors_total counter",
+            ]
+            lines += [f'comet_command_errors_total{{command="{_label(n)}"}} {e["errors"]}' for n, e in items]
+            for key, help_text in (("first_response", "Zeit bis zur ersten Antwort"), ("completion", "Zeit bis zum Ende des Commands")):
+                lines += [
+                    f"# HELP comet_command_{key}_seconds {help_text}",
+                    f"# TYPE comet_command_{key}_seconds histogram",
+                ]
+                for n, e in items:
+                    lines += _histogram_lines(f"comet_command_{key}_seconds", f'command="{_label(n)}"', e[key])
+        lines += [
+            "# HELP comet_commands_in_flight Laufende Slash-Commands",
+            "# TYPE comet_commands_in_flight gauge",
+            f"comet_commands_in_flight {in_flight}",
+        ]
+        return lines
+
+
+class LoopMonitor:
+    """
+    Misst im Bot-Loop regelmäßig, wie verspätet ein asyncio.sleep aufwacht (Loop-Lag),
+    und zählt dabei die laufenden Tasks. Läuft als Task im Loop, daher auch aus
+    Flask-Threads sicher auslesbar.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.lag = Histogram()
+        self.last_lag = 0.0
+        self.tasks = 0
+        self.task = None
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if self.task and not self.task.done() and self.task.get_loop() is loop:
+            return
+        self.task = loop.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, loop.time() - start - self.interval)
+            self.lag.observe(self.last_lag)
+            self.tasks = len(asyncio.all_tasks(loop))
+
+    def prometheus(self) -> list:
+        lines = [
+            "# HELP comet_event_loop_lag_seconds Verspätung des Event-Loops",
+            "# TYPE comet_event_loop_lag_seconds histogram",
+        ]
+        lines += _histogram_lines("comet_event_loop_lag_seconds", 'loop="bot"', self.lag)
+        lines += [
+            "# HELP comet_event_loop_lag_last_seconds Zuletzt gemessene Verspätung",
+            "# TYPE comet_event_loop_lag_last_seconds gauge",
+            f"comet_event_loop_lag_last_seconds {self.last_lag}",
+            "# HELP comet_asyncio_tasks Laufende asyncio-Tasks im Bot-Loop",
+            "# TYPE comet_asyncio_tasks gauge",
+            f"comet_asyncio_tasks {self.tasks}",
+        ]
+        return lines
+
+
+def gateway_prometheus(bot) -> list:
+    """Gateway-Latenz pro Shard (ohne Sharding: Shard 0)."""
+    latencies = getattr(bot, "latencies", None) or [(bot.shard_id or 0, bot.latency)]
+    lines = [
+        "# HELP comet_gateway_latency_seconds Heartbeat-Latenz pro Shard",
+        "# TYPE comet_gateway_latency_seconds gauge",
+    ]
+    lines += [
+        f'comet_gateway_latency_seconds{{shard="{shard_id}"}} {latency}'
+        for shard_id, latency in latencies if math.isfinite(latency)
+    ]
+    return lines
+
+
+def prometheus_text(bot, command_stats: CommandStats, loop_monitor: LoopMonitor) -> str:
+    lines = command_stats.prometheus() + gateway_prometheus(bot) + loop_monitor.prometheus()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,129 @@
+import asyncio
+import concurrent.futures
+import threading
+from urllib.parse import quote
+
+import aiohttp
+
+
+class OAuthError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class DiscordOAuth:
+    """
+    Discord-OAuth2-Flow (Code gegen Token tauschen, Userinfos lesen) über einen
+    gemeinsamen aiohttp-Client mit Connection-Pool und Timeouts.
+
+    - Höchstens max_concurrency Logins laufen gleichzeitig; wer länger als
+      queue_timeout auf einen Platz wartet, bekommt einen 503 statt die API zu blockieren.
+    - Für Flask/waitress belegen höchstens sync_slots Worker-Threads gleichzeitig einen
+      Login (exchange_code_sync), der Rest bleibt frei für /api/stats & Co.
+    - api_base/authorize_url sind konfigurierbar, z.B. für einen lokalen Ersatz-Server.
+    """
+
+    def __init__(self, client_id, client_secret: str, redirect_uri: str, scope: list,
+                 api_base: str = "https://discord.com/api",
+                 authorize_url: str = "https://discord.com/oauth2/authorize",
+                 max_concurrency: int = 8, timeout: float = 10.0, queue_timeout: float = 5.0,
+                 sync_slots: int = 2):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.scope = scope
+        self.api_base = api_base.rstrip("/")
+        self.authorize_url = authorize_url
+        self.max_concurrency = max_concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.queue_timeout = queue_timeout
+        # Gesamtdauer eines Logins: Warten auf einen Platz + Token-Tausch + Userinfos
+        self.login_timeout = queue_timeout + 2 * timeout
+        self.sync_slots = threading.BoundedSemaphore(sync_slots)
+        # Sessions und Semaphoren gehören zu einem Event-Loop (Bot-Loop bzw. eigener Loop für Flask)
+        self.sessions = {}  # loop -> (ClientSession, Semaphore)
+        self.sync_loop = None
+        self.sync_lock = threading.Lock()
+
+    def login_url(self) -> str:
+        return (f"{self.authorize_url}?client_id={self.client_id}&response_type=code"
+                f"&redirect_uri={quote(self.redirect_uri)}&scope={'+'.join(self.scope)}")
+
+    def _client(self):
+        loop = asyncio.get_running_loop()
+        client = self.sessions.get(loop)
+        if client is None or client[0].closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency * 2, ttl_dns_cache=300)
+            client = (aiohttp.ClientSession(connector=connector, timeout=self.timeout),
+                      asyncio.Semaphore(self.max_concurrency))
+            self.sessions[loop] = client
+        return client
+
+    async def _request(self, session, method: str, path: str, **kwargs) -> dict:
+        try:
+            async with session.request(method, f"{self.api_base}{path}", **kwargs) as resp:
+                if resp.status >= 400:
+                    # nur Status loggen, Antworten enthalten Tokens bzw. persönliche Daten
+                    print(f"OAuth {method} {path} fehlgeschlagen: HTTP {resp.status}")
+                    raise OAuthError(400 if resp.status in (400, 401) else 502, f"Discord antwortete mit HTTP {resp.status}")
+                return await resp.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"OAuth {method} {path} fehlgeschlagen: {e!r}")
+            raise OAuthError(504, "Discord ist nicht erreichbar") from e
+
+    async def exchange_code(self, code: str):
+        """Tauscht den OAuth-Code gegen Tokens und liest die Userinfos."""
+        session, semaphore = self._client()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise OAuthError(503, "Zu viele gleichzeitige Logins, bitte erneut versuchen")
+        try:
+            tokens = await self._request(session, "POST", "/oauth2/token", data={
+                "client_id": str(self.client_id),
+                "client_secret": self.client_secret,
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": self.redirect_uri,
+                "scope": " ".join(self.scope),
+            })
+            info = await self._user_info(session, tokens["access_token"])
+        finally:
+            semaphore.release()
+        return tokens, info
+
+    async def _user_info(self, session, access_token: str) -> dict:
+        user = await self._request(session, "GET", "/users/@me", headers={"Authorization": f"Bearer {access_token}"})
+        return {
+            "identify": {"id": user["id"], "username": user["username"]},
+            "email": user.get("email")
+        }
+
+    def exchange_code_sync(self, code: str):
+        """
+        Für Flask/waitress: läuft auf einem eigenen Hintergrund-Loop mit eigenem Pool.
+        Sind alle sync_slots belegt, gibt es sofort einen 503, statt einen weiteren
+        Worker-Thread zu blockieren; nach login_timeout einen 504.
+        """
+        if not self.sync_slots.acquire(blocking=False):
+            raise OAuthError(503, "Zu viele gleichzeitige Logins, bitte erneut versuchen")
+        try:
+            with self.sync_lock:
+                if self.sync_loop is None:
+                    self.sync_loop = asyncio.new_event_loop()
+                    threading.Thread(target=self.sync_loop.run_forever, name="oauth-loop", daemon=True).start()
+            future = asyncio.run_coroutine_threadsafe(self.exchange_code(code), self.sync_loop)
+            try:
+                return future.result(self.login_timeout)
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                raise OAuthError(504, "Discord antwortet nicht, bitte erneut versuchen")
+        finally:
+            self.sync_slots.release()
+
+    async def close(self):
+        """Schließt die Session des aktuellen Loops."""
+        client = self.sessions.pop(asyncio.get_running_loop(), None)
+        if client:
+            await client[0].close()
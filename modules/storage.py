@@ -0,0 +1,310 @@
+import copy
+import itertools
+import json
+import sqlite3
+import threading
+import time
+from modules.user_cache import lookup, assign
+from modules.metrics import normalize_path
+
+
+def split_path(path: str) -> list:
+    return [p for p in path.split("/") if p]
+
+
+def shallow_copy(node):
+    """Firebase-Semantik für shallow=True: Kindknoten werden zu True, Blätter bleiben."""
+    if not isinstance(node, dict):
+        return node
+    return {key: True if isinstance(value, dict) else value for key, value in node.items()}
+
+
+class StorageBackend:
+    """
+    Pfadbasierter Speicher hinter FirebaseDB. Pfade sind "/"-getrennt, None
+    bedeutet "nicht vorhanden" bzw. "löschen" (wie in der Realtime Database).
+    """
+
+    def get(self, path: str, shallow: bool = False):
+        raise NotImplementedError
+
+    def set(self, path: str, value):
+        raise NotImplementedError
+
+    def update(self, path: str, values: dict):
+        """Multi-Path-Update: Keys in values dürfen selbst Pfade sein."""
+        raise NotImplementedError
+
+    def delete(self, path: str):
+        self.set(path, None)
+
+    def transaction(self, path: str, func):
+        """Führt func(aktueller_wert) -> neuer_wert atomar aus und gibt den neuen Wert zurück."""
+        raise NotImplementedError
+
+    def increment(self, path: str, delta):
+        self.increment_many({path: delta})
+
+    def increment_many(self, deltas: dict):
+        """Addiert mehrere Deltas ({pfad: delta}) auf Zahlenwerte."""
+        for path, delta in deltas.items():
+            self.transaction(path, lambda current, delta=delta: (current or 0) + delta)
+
+    def listen(self, path: str, callback):
+        """
+        Ruft callback(event_type, pfad, daten) bei Änderungen unter path auf.
+        Lokale Backends ändern sich nur über den Bot selbst und brauchen das nicht.
+        """
+        return None
+
+
+class InstrumentedBackend(StorageBackend):
+    """
+    Misst jeden Aufruf (= Round-Trip) eines Backends: Anzahl, Bytes und Latenz pro Pfadmuster.
+    Die Bytes kosten ein json.dumps von Payload und Ergebnis, daher wird nur jeder
+    size_sample-te Aufruf gemessen und hochgerechnet (0 = keine Bytes messen).
+    """
+
+    def __init__(self, backend: StorageBackend, stats, size_sample: int = 100):
+        self.backend = backend
+        self.stats = stats
+        self.size_sample = size_sample
+        self.calls = itertools.count()
+
+    @staticmethod
+    def _size(value) -> int:
+        return len(json.dumps(value, default=str)) if value is not None else 0
+
+    @staticmethod
+    def _pattern(path: str, keys=None) -> str:
+        if path.strip("/") or not keys:
+            return normalize_path(path)
+        # Multi-Path-Update auf die Wurzel
+        patterns = {normalize_path(key) for key in keys}
+        return patterns.pop() if len(patterns) == 1 else "(multi-path)"
+
+    def _measure(self, op: str, pattern: str, func, payload=None):
+        start = time.perf_counter()
+        result = None
+        try:
+            result = func()
+            return result
+        finally:
+            nbytes = 0
+            if self.size_sample and next(self.calls) % self.size_sample == 0:
+                nbytes = (self._size(payload) + self._size(result)) * self.size_sample
+            self.stats.record(op, pattern, time.perf_counter() - start, nbytes)
+
+    def get(self, path: str, shallow: bool = False):
+        op = "get_shallow" if shallow else "get"
+        return self._measure(op, self._pattern(path), lambda: self.backend.get(path, shallow=shallow))
+
+    def set(self, path: str, value):
+        self._measure("set", self._pattern(path), lambda: self.backend.set(path, value), value)
+
+    def update(self, path: str, values: dict):
+        self._measure("update", self._pattern(path, values), lambda: self.backend.update(path, values), values)
+
+    def delete(self, path: str):
+        self._measure("delete", self._pattern(path), lambda: self.backend.delete(path))
+
+    def transaction(self, path: str, func):
+        return self._measure("transaction", self._pattern(path), lambda: self.backend.transaction(path, func))
+
+    def increment_many(self, deltas: dict):
+        self._measure("increment", self._pattern("", deltas), lambda: self.backend.increment_many(deltas), deltas)
+
+    def listen(self, path: str, callback):
+        return self.backend.listen(path, callback)
+
+
+class FirebaseBackend(StorageBackend):
+    def __init__(self, db_url: str, cred_path: str):
+        import firebase_admin
+        from firebase_admin import credentials, db
+
+        self.cred = credentials.Certificate(cred_path)
+        try:
+            firebase_admin.get_app()
+        except ValueError:
+            firebase_admin.initialize_app(self.cred, {
+                'databaseURL': db_url
+            })
+        self.root = db.reference("/")
+
+    def _ref(self, path: str):
+        path = path.strip("/")
+        return self.root.child(path) if path else self.root
+
+    def get(self, path: str, shallow: bool = False):
+        return self._ref(path).get(shallow=shallow)
+
+    def set(self, path: str, value):
+        self._ref(path).set(value)
+
+    def update(self, path: str, values: dict):
+        self._ref(path).update(values)
+
+    def delete(self, path: str):
+        self._ref(path).delete()
+
+    def transaction(self, path: str, func):
+        return self._ref(path).transaction(func)
+
+    def increment_many(self, deltas: dict):
+        # ServerValue.increment als Multi-Path-Update: ein Request, ohne vorher zu lesen
+        self.root.update({path.strip("/"): {".sv": {"increment": delta}} for path, delta in deltas.items()})
+
+    def listen(self, path: str, callback):
+        base = path.strip("/")
+        return self._ref(path).listen(
+            lambda event: callback(event.event_type, f"{base}{event.path}".rstrip("/"), event.data)
+        )
+
+
+class MemoryBackend(StorageBackend):
+    """Reiner In-Memory-Speicher, z.B. für Tests, Benchmarks oder lokale Entwicklung."""
+
+    def __init__(self, data: dict = None):
+        self.data = copy.deepcopy(data) if data else None
+        self.lock = threading.RLock()
+
+    def get(self, path: str, shallow: bool = False):
+        with self.lock:
+            node = lookup(self.data, split_path(path))
+            return shallow_copy(node) if shallow else copy.deepcopy(node)
+
+    def _set(self, parts: list, value):
+        if isinstance(value, dict) and not value:
+            value = None
+        self.data = assign(self.data, parts, copy.deepcopy(value))
+
+    def set(self, path: str, value):
+        with self.lock:
+            self._set(split_path(path), value)
+
+    def update(self, path: str, values: dict):
+        with self.lock:
+            base = split_path(path)
+            for key, value in values.items():
+                self._set(base + split_path(key), value)
+
+    def transaction(self, path: str, func):
+        with self.lock:
+            parts = split_path(path)
+            value = func(copy.deepcopy(lookup(self.data, parts)))
+            self._set(parts, value)
+            return value
+
+    def increment_many(self, deltas: dict):
+        with self.lock:
+            for path, delta in deltas.items():
+                parts = split_path(path)
+                self._set(parts, (lookup(self.data, parts) or 0) + delta)
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Lokaler Speicher in SQLite (WAL). Jedes Blatt wird als eigene Zeile
+    (pfad -> JSON-Wert) gespeichert, Teilbäume werden über einen
+    Bereichsscan auf dem Primärschlüssel (Pfadpräfix) gelesen.
+    """
+
+    def __init__(self, db_path: str = "comet.db"):
+        self.db_path = db_path
+        self.local = threading.local()
+        self.write_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS nodes (path TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # eine Verbindung pro Thread, damit Lesezugriffe parallel laufen können
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    @staticmethod
+    def _flatten(prefix: str, value, out: list):
+        if isinstance(value, dict):
+            for key, child in value.items():
+                SQLiteBackend._flatten(f"{prefix}/{key}" if prefix else str(key), child, out)
+        elif value is not None:
+            out.append((prefix, json.dumps(value)))
+        return out
+
+    def _read(self, conn, path: str):
+        if path:
+            rows = conn.execute(
+                "SELECT path, value FROM nodes WHERE path = ? OR (path >= ? AND path < ?)",
+                (path, f"{path}/", f"{path}0")  # "0" folgt direkt auf "/"
+            ).fetchall()
+        else:
+            rows = conn.execute("SELECT path, value FROM nodes").fetchall()
+        node = None
+        offset = len(split_path(path))
+        for row_path, value in rows:
+            node = assign(node, split_path(row_path)[offset:], json.loads(value))
+        return node
+
+    def _write(self, conn, path: str, value):
+        parts = split_path(path)
+        # Teilbaum und Blätter auf dem Weg dorthin entfernen
+        if parts:
+            conn.execute("DELETE FROM nodes WHERE path = ? OR (path >= ? AND path < ?)", (path, f"{path}/", f"{path}0"))
+            for i in range(1, len(parts)):
+                conn.execute("DELETE FROM nodes WHERE path = ?", ("/".join(parts[:i]),))
+        else:
+            conn.execute("DELETE FROM nodes")
+        rows = self._flatten(path, value, [])
+        conn.executemany("INSERT INTO nodes (path, value) VALUES (?, ?)", rows)
+
+    def get(self, path: str, shallow: bool = False):
+        node = self._read(self._conn(), "/".join(split_path(path)))
+        return shallow_copy(node) if shallow else node
+
+    def _transaction(self, func):
+        conn = self._conn()
+        with self.write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    def set(self, path: str, value):
+        self._transaction(lambda conn: self._write(conn, "/".join(split_path(path)), value))
+
+    def update(self, path: str, values: dict):
+        base = split_path(path)
+
+        def write_all(conn):
+            for key, value in values.items():
+                self._write(conn, "/".join(base + split_path(key)), value)
+
+        self._transaction(write_all)
+
+    def transaction(self, path: str, func):
+        path = "/".join(split_path(path))
+
+        def apply(conn):
+            value = func(self._read(conn, path))
+            self._write(conn, path, value)
+            return value
+
+        return self._transaction(apply)
+
+    def increment_many(self, deltas: dict):
+        def apply(conn):
+            for path, delta in deltas.items():
+                path = "/".join(split_path(path))
+                self._write(conn, path, (self._read(conn, path) or 0) + delta)
+
+        self._transaction(apply)
@@ -1,40 +1,354 @@
-from deep_translator import GoogleTranslator
 import asyncio
 import re
-import uuid
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import discord
 from discord.ui import View
 
+# Platzhalter, die vor der Übersetzung durch feste Tokens ersetzt werden:
+# eigene Emojis, Erwähnungen (<@id>, <@&id>, <#id>), Zeitstempel und :emoji:/:text:
+_PLACEHOLDER = re.compile(r'<a?:\w+:\d+>|<(?:@[!&]?|#)\d+>|<t:\d+(?::[a-zA-Z])?>|:[a-zA-Z0-9_]+:')
+
+# Trennzeilen für Sammelübersetzungen; nummeriert, damit Reihenfolge und Anzahl prüfbar sind
+_BATCH_SEPARATOR = "\n<sep{}>\n"
+_SEPARATOR = re.compile(r"\s*<sep(\d+)>\s*")
+_BATCH_CHARS = 4500  # deep_translator erlaubt höchstens 5000 Zeichen pro Request
+
+
+class TranslationCache:
+    """
+    Zweistufiger Cache für Übersetzungen, Schlüssel (normalisierter Text, Zielsprache):
+    LRU im Speicher, darunter eine SQLite-Datei, die Neustarts überlebt (db_path=None: nur Speicher).
+    """
+
+    def __init__(self, max_entries: int = 5000, db_path: str = "translations.db"):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.entries = OrderedDict()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            conn = self._conn()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "lang TEXT NOT NULL, text TEXT NOT NULL, translated TEXT NOT NULL, "
+                "PRIMARY KEY (lang, text)) WITHOUT ROWID"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def get_memory(self, text: str, lang: str):
+        with self.lock:
+            translated = self.entries.get((text, lang))
+            if translated is not None:
+                self.entries.move_to_end((text, lang))
+                self.hits += 1
+            return translated
+
+    def _remember(self, text: str, lang: str, translated: str):
+        with self.lock:
+            self.entries[(text, lang)] = translated
+            self.entries.move_to_end((text, lang))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_disk(self, text: str, lang: str):
+        """Blockierend, im Übersetzungs-Executor aufrufen."""
+        if not self.db_path:
+            return None
+        row = self._conn().execute(
+            "SELECT translated FROM translations WHERE lang = ? AND text = ?", (lang, text)
+        ).fetchone()
+        if row is None:
+            return None
+        with self.lock:
+            self.disk_hits += 1
+        self._remember(text, lang, row[0])
+        return row[0]
+
+    def count_miss(self):
+        # Zähler werden aus mehreren Executor-Threads erhöht
+        with self.lock:
+            self.misses += 1
+
+    def put(self, text: str, lang: str, translated: str):
+        """Blockierend, im Übersetzungs-Executor aufrufen."""
+        self._remember(text, lang, translated)
+        if self.db_path:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO translations (lang, text, translated) VALUES (?, ?, ?)",
+                (lang, text, translated)
+            )
+
+    def stats(self) -> dict:
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / total, 4) if total else None,
+        }
+
+
+_cache = None
+_executor = None
+_translators = threading.local()  # pro Thread ein GoogleTranslator je Sprache (Instanzen sind nicht thread-safe)
+_pending = {}  # (text, lang) -> Future, gleiche Texte nur einmal gleichzeitig übersetzen
+_batch_limits = {}  # loop -> Semaphore für Sammelübersetzungen
+_max_batches = 2
+_translate_dynamic = False
+
+
+def configure(cache_size: int = 5000, cache_path: str = "translations.db", workers: int = 4,
+              max_batches: int = 2, translate_dynamic: bool = False):
+    """
+    Cache und Executor einstellen (main.py); ohne Aufruf gelten die Standardwerte.
+    translate_dynamic: Embed-Texte, die nicht im Nachrichtenkatalog stehen, per translate_many übersetzen.
+    """
+    global _cache, _executor, _max_batches, _translate_dynamic
+    _cache = TranslationCache(cache_size, cache_path or None)
+    _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate")
+    _max_batches = max_batches
+    _translate_dynamic = translate_dynamic
+    _batch_limits.clear()
+
+
+def cache_stats() -> dict:
+    return _cache.stats() if _cache else {}
+
+
+def _translator(dest_lang: str):
+    translators = getattr(_translators, "by_lang", None)
+    if translators is None:
+        translators = _translators.by_lang = {}
+    translator = translators.get(dest_lang)
+    if translator is None:
+        # deep_translator erst bei der ersten Übersetzung importieren
+        from deep_translator import GoogleTranslator
+        translator = translators[dest_lang] = GoogleTranslator(source="auto", target=dest_lang)
+    return translator
+
+
+def _normalize(text: str):
+    """Text mit festen Platzhalter-Tokens (<ph0>, <ph1>, ...) und der Zuordnung zurück."""
+    # Nummerierung nach erstem Vorkommen: gleicher Satz mit anderen Emojis -> gleicher Cache-Eintrag
+    placeholders = dict.fromkeys(_PLACEHOLDER.findall(text))
+    placeholder_map = {ph: f"<ph{i}>" for i, ph in enumerate(placeholders)}
+    normalized = _PLACEHOLDER.sub(lambda match: placeholder_map[match.group(0)], text.strip())
+    return normalized, placeholder_map
+
+
+def _lookup_or_translate(normalized: str, dest_lang: str, placeholder_map: dict) -> str:
+    cached = _cache.get_disk(normalized, dest_lang)
+    if cached is not None:
+        return cached
+    _cache.count_miss()
+    translated = _translator(dest_lang).translate(normalized)
+    # Übersetzung ohne alle Tokens ist unbrauchbar -> nicht cachen
+    if not translated or any(token not in translated for token in placeholder_map.values()):
+        raise ValueError("Platzhalter gingen bei der Übersetzung verloren")
+    _cache.put(normalized, dest_lang, translated)
+    return translated
+
+
 async def translate_text(text: str, dest_lang: str):
-    loop = asyncio.get_event_loop()
-
-    # Platzhalter wie :emoji: oder :text: merken
-    placeholders = list(set(re.findall(r':[a-zA-Z0-9_]+:', text)))
-    placeholder_map = {ph: str(uuid.uuid4()) for ph in placeholders}
-
-    temp_text = text
-    for ph, key in placeholder_map.items():
-        temp_text = temp_text.replace(ph, key)
-
-    try:
-        translated = await loop.run_in_executor(
-            None, lambda: GoogleTranslator(source="auto", target=dest_lang).translate(temp_text)
-        )
-        for ph, key in placeholder_map.items():
-            translated = translated.replace(key, ph)
-        return translated
-    except Exception:
+    if _cache is None:
+        configure()
+    if not text or not text.strip():
         return text
 
+    normalized, placeholder_map = _normalize(text)
+    translated = _cache.get_memory(normalized, dest_lang)
+    if translated is None:
+        key = (normalized, dest_lang)
+        future = _pending.get(key)
+        try:
+            if future is None:
+                loop = asyncio.get_running_loop()
+                future = _pending[key] = loop.run_in_executor(
+                    _executor, _lookup_or_translate, normalized, dest_lang, placeholder_map
+                )
+                future.add_done_callback(lambda _: _pending.pop(key, None))
+            translated = await asyncio.shield(future)
+        except Exception:
+            return text
+
+    return _restore(translated, placeholder_map)
+
+
+def _restore(translated: str, placeholder_map: dict) -> str:
+    for ph, token in placeholder_map.items():
+        translated = translated.replace(token, ph)
+    return translated
+
+
+def _split_batch(translated: str, count: int):
+    """Zerlegt eine Sammelübersetzung; None, wenn Trennzeilen fehlen oder vertauscht sind."""
+    parts = _SEPARATOR.split(translated.strip())
+    if parts[1::2] != [str(n) for n in range(1, count)]:
+        return None
+    return [part.strip() for part in parts[0::2]]
+
+
+def _translate_batch(items: list, dest_lang: str) -> list:
+    """
+    Im Executor: items = [(normalisierter Text, Platzhalter-Map)]. Nicht gecachte Texte gehen
+    gebündelt (durch Trennzeilen verbunden) in einen Request; passt das Ergebnis nicht,
+    wird jedes betroffene Item einzeln übersetzt. Gibt pro Item die Übersetzung oder None zurück.
+    """
+    results = [None] * len(items)
+    todo = []
+    for i, (normalized, _) in enumerate(items):
+        results[i] = _cache.get_disk(normalized, dest_lang)
+        if results[i] is None:
+            todo.append(i)
+
+    chunks, chunk, size = [], [], 0
+    for i in todo:
+        length = len(items[i][0]) + len(_BATCH_SEPARATOR) + 4
+        if chunk and size + length > _BATCH_CHARS:
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(i)
+        size += length
+    if chunk:
+        chunks.append(chunk)
+
+    for chunk in chunks:
+        parts = None
+        if len(chunk) > 1:
+            joined = "".join((_BATCH_SEPARATOR.format(n) if n else "") + items[i][0] for n, i in enumerate(chunk))
+            try:
+                parts = _split_batch(_translator(dest_lang).translate(joined), len(chunk))
+            except Exception:
+                parts = None
+        for n, i in enumerate(chunk):
+            normalized, placeholder_map = items[i]
+            text = parts[n] if parts else None
+            if text and all(token in text for token in placeholder_map.values()):
+                _cache.count_miss()
+                _cache.put(normalized, dest_lang, text)
+                results[i] = text
+                continue
+            try:
+                results[i] = _lookup_or_translate(normalized, dest_lang, placeholder_map)
+            except Exception:
+                results[i] = None
+    return results
+
+
+def _batch_limit() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    limit = _batch_limits.get(loop)
+    if limit is None:
+        limit = _batch_limits[loop] = asyncio.Semaphore(_max_batches)
+    return limit
+
+
+async def translate_many(texts: list, dest_lang: str) -> list:
+    """
+    Übersetzt mehrere Texte mit einem Request (statt einem pro Text). Gecachte Texte
+    kosten nichts; was nicht übersetzt werden konnte, bleibt unverändert.
+    """
+    if _cache is None:
+        configure()
+    results = list(texts)
+    items, positions = [], []
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            continue
+        normalized, placeholder_map = _normalize(text)
+        cached = _cache.get_memory(normalized, dest_lang)
+        if cached is not None:
+            results[i] = _restore(cached, placeholder_map)
+            continue
+        items.append((normalized, placeholder_map))
+        positions.append(i)
+
+    if items:
+        async with _batch_limit():
+            loop = asyncio.get_running_loop()
+            try:
+                translated = await loop.run_in_executor(_executor, _translate_batch, items, dest_lang)
+            except Exception:
+                translated = [None] * len(items)
+        for i, (_, placeholder_map), text in zip(positions, items, translated):
+            if text is not None:
+                results[i] = _restore(text, placeholder_map)
+    return results
+
+
+_catalog = None
+
+
+def load_catalog(locales_dir: str = "locales", source_lang: str = "de"):
+    """Lädt den Nachrichtenkatalog (modules/i18n.py) einmal beim Start."""
+    global _catalog
+    from modules.i18n import Catalog
+    _catalog = Catalog(locales_dir, source_lang)
+    return _catalog
+
+
+async def guild_language(ctx) -> str:
+    """Sprache der Guild aus bot.guild_settings (gecacht), sonst die Quellsprache."""
+    default = _catalog.source_lang if _catalog else "de"
+    guild = getattr(ctx, "guild", None)
+    settings = getattr(getattr(ctx, "bot", None), "guild_settings", None)
+    if guild is None or settings is None:
+        return default
+    return (await settings.aget(guild.id)).language or default
+
+
+async def localize_embed(embed: discord.Embed, lang: str) -> discord.Embed:
+    """
+    Kopie des Embeds in der Zielsprache; das Original bleibt deutsch (wird z.B. von Views weiterbearbeitet).
+    Texte aus dem Katalog kosten keinen Request; der Rest wird nur mit translate_dynamic
+    übersetzt, dann gesammelt in einem Request.
+    """
+    source_lang = _catalog.source_lang if _catalog else "de"
+    if lang == source_lang:
+        return embed
+    data = embed.to_dict()
+    misses = []
+    if _catalog is not None:
+        _catalog.localize_embed_dict(data, lang, misses)
+    if _translate_dynamic:
+        if _catalog is None:
+            from modules.i18n import embed_text_slots
+            misses = embed_text_slots(data)
+        translated = await translate_many([container[key] for container, key in misses], lang)
+        for (container, key), text in zip(misses, translated):
+            container[key] = text
+    elif _catalog is None or lang not in _catalog.targets:
+        return embed
+    return discord.Embed.from_dict(data)
+
+
 async def respond_with_view(
     ctx,
     embed: discord.Embed,
-    preferred_lang: str,
+    preferred_lang: str = None,
     mode: str = "normal",
     message_to_edit: discord.Message = None,
     file: discord.File = None,
     ephemeral: bool = False
 ) -> discord.Message:
+    # ohne preferred_lang: Sprache der Guild
+    embed = await localize_embed(embed, preferred_lang or await guild_language(ctx))
+
     if mode == "edit" and message_to_edit:
         if file:
             return await message_to_edit.edit(embed=embed, file=file)
@@ -0,0 +1,147 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+def split_user_path(path: str):
+    """
+    Zerlegt einen Pfad in (Userknoten, Restpfad), z.B.
+    "servers/1/users/2/eco/balance" -> ("servers/1/users/2", ["eco", "balance"]).
+    Gibt None zurück, wenn der Pfad nicht in einem Userknoten liegt.
+    """
+    parts = [p for p in path.split("/") if p]
+    if len(parts) >= 4 and parts[0] == "servers" and parts[2] == "users":
+        return "/".join(parts[:4]), parts[4:]
+    return None
+
+
+def lookup(node, parts: list):
+    for part in parts:
+        if not isinstance(node, dict):
+            return None
+        node = node.get(part)
+    return node
+
+
+def assign(node, parts: list, value):
+    """Setzt value unter parts in node (None = löschen) und gibt den neuen Knoten zurück."""
+    if not parts:
+        return value
+    if not isinstance(node, dict):
+        node = {}
+    current = node
+    for part in parts[:-1]:
+        if not isinstance(current.get(part), dict):
+            current[part] = {}
+        current = current[part]
+    if value is None:
+        current.pop(parts[-1], None)
+    else:
+        current[parts[-1]] = value
+    return node
+
+
+class UserCache:
+    """
+    Begrenzter LRU/TTL-Cache für servers/{gid}/users/{uid}-Knoten.
+    Wird von FirebaseDB bei jedem Schreibzugriff mitgeführt (write-through)
+    und durch Firebase-Listener-Events aktualisiert.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (ablaufzeit, daten)
+        # Ladevorgänge: key -> [anzahl laufender Loads, Generation des letzten Schreibzugriffs]
+        self.loading = {}
+        self.generation = 0  # steigt mit jedem Schreibzugriff
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """
+        Gibt (gefunden, daten, token) zurück. Bei einem Miss ist token die aktuelle
+        Generation; der geladene Knoten muss mit put(key, daten, token) abgelegt
+        oder der Load mit release(key) abgebrochen werden.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, copy.deepcopy(entry[1]), None
+            if entry:
+                del self.entries[key]
+            self.misses += 1
+            self.loading.setdefault(key, [0, -1])[0] += 1
+            return False, None, self.generation
+
+    def _finish(self, key: str) -> int:
+        """Beendet einen Load, gibt die Generation des letzten Schreibzugriffs währenddessen zurück."""
+        state = self.loading.get(key)
+        if state is None:
+            return -1
+        state[0] -= 1
+        if state[0] <= 0:
+            del self.loading[key]
+        return state[1]
+
+    def put(self, key: str, data, token: int):
+        """Speichert einen frisch geladenen Knoten, außer seit Ausgabe von token wurde er beschrieben."""
+        with self.lock:
+            if self._finish(key) > token:
+                return
+            self.entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(data))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def release(self, key: str):
+        """Bricht einen Load ab (z.B. wenn das Lesen fehlgeschlagen ist)."""
+        with self.lock:
+            self._finish(key)
+
+    def _bump(self, keys):
+        self.generation += 1
+        for key in keys:
+            self.loading[key][1] = self.generation
+
+    def apply(self, key: str, parts: list, value):
+        """Überträgt einen Schreibzugriff (set-Semantik, None = löschen) auf einen gecachten Knoten."""
+        with self.lock:
+            self._bump([key] if key in self.loading else [])
+            entry = self.entries.get(key)
+            if not entry:
+                return
+            expires, node = entry
+            node = assign(node, parts, copy.deepcopy(value))
+            self.entries[key] = (expires, node)
+
+    def invalidate(self, key: str):
+        """
+        Verwirft einen Knoten und macht laufende Ladevorgänge ungültig.
+        Für serverseitige Increments: vorher und nachher aufrufen, statt delta zu addieren -
+        der gecachte Wert kann das Delta (über Listener-Echo oder parallelen Read) schon enthalten.
+        """
+        with self.lock:
+            self._bump([key] if key in self.loading else [])
+            self.entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str = ""):
+        with self.lock:
+            self._bump([key for key in self.loading if key.startswith(prefix)])
+            for key in [k for k in self.entries if k.startswith(prefix)]:
+                del self.entries[key]
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,162 @@
+import threading
+import time
+
+
+class WriteBehindBuffer:
+    """
+    Sammelt Increments auf Zähler-Pfaden im Speicher und schreibt sie gebündelt
+    über flush_func({pfad: delta}), höchstens chunk_size Pfade pro Aufruf. Geflusht
+    wird spätestens nach max_staleness Sekunden oder sobald max_ops Increments offen sind.
+    """
+
+    def __init__(self, flush_func, max_staleness: float = 1.0, max_ops: int = 100, chunk_size: int = 500):
+        self.flush_func = flush_func
+        self.max_staleness = max_staleness
+        self.max_ops = max_ops
+        self.chunk_size = chunk_size
+        self.pending = {}  # pfad -> delta
+        self.inflight = {}  # gerade im Flush befindliche Deltas
+        self.applying = set()  # Pfade des Chunks, der gerade ins Backend geschrieben wird
+        self.epoch = 0  # zählt Beginn und Ende jedes Chunks, siehe read()
+        self.ops = 0
+        self.oldest = None
+        self.lock = threading.Lock()
+        self.settled = threading.Condition(self.lock)
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self.thread.start()
+
+    def add(self, path: str, delta):
+        with self.lock:
+            self.pending[path] = self.pending.get(path, 0) + delta
+            self.ops += 1
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+            if self.ops >= self.max_ops:
+                self.wakeup.set()
+
+    def _deltas(self, path: str) -> list:
+        prefix = f"{path}/"
+        return [(p, d) for source in (self.inflight, self.pending) for p, d in source.items()
+                if p == path or p.startswith(prefix)]
+
+    def read(self, path: str, reader):
+        """
+        Liest über reader() und rechnet noch nicht geschriebene Deltas unter path ein.
+        Wie ein Seqlock: wird währenddessen ein Chunk geschrieben, ist unklar, ob der
+        gelesene Wert ihn schon enthält - dann neu lesen statt doppelt zu zählen.
+        """
+        while True:
+            with self.lock:
+                deltas = self._deltas(path)
+                while deltas and self.applying:
+                    self.settled.wait()
+                    deltas = self._deltas(path)
+                epoch = self.epoch
+            value = reader()
+            if not deltas:
+                return value
+            with self.lock:
+                if self.epoch == epoch:
+                    return self._overlay(path, value, deltas)
+
+    @staticmethod
+    def _overlay(path: str, value, deltas: list):
+        prefix = f"{path}/"
+        for delta_path, delta in deltas:
+            if delta_path == path:
+                value = (value if isinstance(value, (int, float)) else 0) + delta
+                continue
+            if not isinstance(value, dict):
+                value = {}
+            current = value
+            parts = delta_path[len(prefix):].split("/")
+            for part in parts[:-1]:
+                if not isinstance(current.get(part), dict):
+                    current[part] = {}
+                current = current[part]
+            old = current.get(parts[-1])
+            current[parts[-1]] = (old if isinstance(old, (int, float)) else 0) + delta
+        return value
+
+    def has_pending(self, path: str) -> bool:
+        prefix = f"{path}/"
+        with self.lock:
+            return any(p == path or p.startswith(prefix) or path.startswith(f"{p}/")
+                       for source in (self.inflight, self.pending) for p in source)
+
+    def discard(self, path: str):
+        """
+        Verwirft noch nicht geschriebene Deltas unter path (z.B. weil der Wert gerade
+        überschrieben wird) - auch die eines laufenden Flushs, die noch in keinem Chunk
+        stecken. Wird ein betroffener Chunk gerade geschrieben, wird auf ihn gewartet,
+        damit sein Increment nicht nach dem Überschreiben ankommt.
+        """
+        prefix = f"{path}/" if path else ""
+        with self.lock:
+            while any(p == path or p.startswith(prefix) or path.startswith(f"{p}/") for p in self.applying):
+                self.settled.wait()
+            removed = False
+            for source in (self.pending, self.inflight):
+                for p in [p for p in source if p == path or p.startswith(prefix)]:
+                    del source[p]
+                    removed = True
+            if removed:
+                # laufende read()-Aufrufe dürfen die verworfenen Deltas nicht mehr einrechnen
+                self.epoch += 1
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return
+                self.inflight, self.pending = self.pending, {}
+                self.ops = 0
+                self.oldest = None
+
+            while True:
+                with self.lock:
+                    # Chunk erst jetzt bilden: discard() kann inzwischen Pfade entfernt haben
+                    chunk = dict(list(self.inflight.items())[:self.chunk_size])
+                    if not chunk:
+                        return
+                    self.applying = set(chunk)
+                    self.epoch += 1
+                failed = False
+                try:
+                    self.flush_func(chunk)
+                except Exception as e:
+                    # nicht verlieren: nur dieser Chunk kommt zurück in den Puffer
+                    print(f"Write-Behind-Flush fehlgeschlagen ({len(chunk)} Pfade): {e}")
+                    failed = True
+                finally:
+                    with self.lock:
+                        # geschrieben bzw. zurückgestellt: ab jetzt nicht mehr als in-flight einrechnen
+                        for p, d in chunk.items():
+                            del self.inflight[p]
+                            if failed:
+                                self.pending[p] = self.pending.get(p, 0) + d
+                        if failed:
+                            self.ops = len(self.pending)
+                            self.oldest = self.oldest or time.monotonic()
+                        self.applying = set()
+                        self.epoch += 1
+                        self.settled.notify_all()
+
+    def _run(self):
+        while not self.closed:
+            self.wakeup.wait(self.max_staleness / 2)
+            self.wakeup.clear()
+            with self.lock:
+                due = self.oldest is not None and (
+                    self.ops >= self.max_ops or time.monotonic() - self.oldest >= self.max_staleness
+                )
+            if due:
+                self.flush()
+
+    def close(self):
+        self.closed = True
+        self.wakeup.set()
+        self.flush()
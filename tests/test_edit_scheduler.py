@@ -0,0 +1,48 @@
+"""
+StreamingMessage.close(): schlägt der letzte Edit fehl, müssen die restlichen
+Abschnitte trotzdem als Folgenachrichten gesendet werden.
+Start: python -m pytest -q tests
+"""
+import asyncio
+
+import pytest
+
+discord = pytest.importorskip("discord")
+
+from modules.edit_scheduler import ChannelBudget, StreamingMessage
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content):
+        self.sent.append(content)
+        return FakeMessage(self)
+
+
+class FakeMessage:
+    def __init__(self, channel, fail_edits: bool = False):
+        self.channel = channel
+        self.fail_edits = fail_edits
+        self.content = None
+
+    async def edit(self, content):
+        if self.fail_edits:
+            raise RuntimeError("Unknown Message")
+        self.content = content
+
+
+def test_close_sends_rest_when_final_edit_fails():
+    async def scenario():
+        channel = FakeChannel()
+        first = FakeMessage(channel, fail_edits=True)
+        stream = StreamingMessage(first, ChannelBudget(interval=0, min_interval=0), limit=20)
+        stream.closed = True  # nur den Abschluss testen, keine Zwischenstände
+        stream.append("eins zwei drei vier fünf sechs sieben acht")
+        await stream.close()
+        return channel
+
+    channel = asyncio.run(scenario())
+    assert channel.sent
+    assert "acht" in channel.sent[-1]
@@ -0,0 +1,38 @@
+"""
+Rangliste: ein Load, der vor einem Schreibzugriff gelesen wurde, darf nicht
+gespeichert werden; nach der TTL wird neu aufgebaut.
+Start: python -m pytest -q tests
+"""
+import time
+
+from modules.leaderboard import LeaderboardIndex
+
+GUILD = "1"
+
+
+def test_stale_load_is_not_stored():
+    index = LeaderboardIndex()
+    found, _, first = index.top(GUILD, "eco/balance", 3)
+    assert not found
+    _, _, second = index.top(GUILD, "eco/balance", 3)
+    index.write(f"servers/{GUILD}/users/2/eco/balance", 50)
+    index.load(GUILD, {"2": {"eco": {"balance": 50}}}, first)
+    index.load(GUILD, {"2": {"eco": {"balance": 0}}}, second)
+    assert GUILD not in index.boards
+    assert not index.loading
+
+    _, _, fresh = index.top(GUILD, "eco/balance", 3)
+    index.load(GUILD, {"2": {"eco": {"balance": 50}}}, fresh)
+    assert index.top(GUILD, "eco/balance", 3)[:2] == (True, [("2", 50)])
+
+
+def test_boards_expire():
+    index = LeaderboardIndex(ttl=0.01)
+    _, _, token = index.top(GUILD, "points/points", 3)
+    index.load(GUILD, {"2": {"points": {"points": 4}}}, token)
+    assert index.top(GUILD, "points/points", 3)[0]
+    time.sleep(0.02)
+    found, _, token = index.top(GUILD, "points/points", 3)
+    assert not found
+    index.release(GUILD)
+    assert not index.loading
@@ -0,0 +1,184 @@
+"""
+Nebenläufigkeitstest für die Ledger-Operationen von FirebaseDB gegen MemoryBackend:
+einige hundert gleichzeitige atransfer/aconvert/aincrement-Aufrufe plus Reads.
+Start: python -m pytest -q tests
+"""
+import asyncio
+import random
+import threading
+
+import pytest
+
+pytest.importorskip("discord")
+
+from modules.firebase_db import FirebaseDB
+from modules.storage import MemoryBackend
+
+GUILD = "1"
+USERS = [str(uid) for uid in range(100, 120)]
+START_BALANCE = 1000
+
+
+class EchoBackend(MemoryBackend):
+    """Wie Firebase: Listener-Events kommen an, bevor der schreibende Aufruf zurückkehrt."""
+
+    def __init__(self, data: dict = None):
+        super().__init__(data)
+        self.callback = None
+
+    def listen(self, path: str, callback):
+        self.callback = callback
+        return True
+
+    def _echo(self, path: str):
+        if self.callback:
+            self.callback("put", path.strip("/"), self.get(path))
+
+    def transaction(self, path: str, func):
+        value = super().transaction(path, func)
+        self._echo(path)
+        return value
+
+    def increment_many(self, deltas: dict):
+        super().increment_many(deltas)
+        for path in deltas:
+            self._echo(path)
+
+
+class HeldFlushBackend(MemoryBackend):
+    """Hält increment_many an, bis der Test es freigibt."""
+
+    def __init__(self, data: dict = None):
+        super().__init__(data)
+        self.started = threading.Event()
+        self.resume = threading.Event()
+
+    def increment_many(self, deltas: dict):
+        self.started.set()
+        self.resume.wait(5)
+        super().increment_many(deltas)
+
+
+def make_db(backend_cls, write_behind: bool) -> FirebaseDB:
+    users = {uid: {"eco": {"balance": START_BALANCE}, "points": {"points": 0}} for uid in USERS}
+    db = FirebaseDB(
+        "", "", backend=backend_cls({"servers": {GUILD: {"users": users}}}),
+        max_concurrency=8, cache_size=100, write_behind=write_behind,
+        write_behind_staleness=0.005, write_behind_ops=10, batch_size=4, instrument=False
+    )
+    db.listen(GUILD)
+    return db
+
+
+def user_path(uid: str, field: str) -> str:
+    return f"servers/{GUILD}/users/{uid}/{field}"
+
+
+async def run_ops(db: FirebaseDB, count: int, seed: int) -> int:
+    """Führt count zufällige Operationen gleichzeitig aus, gibt die Summe der Increments zurück."""
+    rng = random.Random(seed)
+    added = 0
+    ops = []
+    for _ in range(count):
+        kind = rng.choice(("transfer", "convert", "increment", "read"))
+        uid, other = rng.sample(USERS, 2)
+        amount = rng.randint(1, 400)
+        if kind == "transfer":
+            ops.append(db.atransfer(user_path(uid, "eco/balance"), user_path(other, "eco/balance"), amount))
+        elif kind == "convert":
+            # gain == amount: Kontostand + Punkte bleiben erhalten
+            ops.append(db.aconvert(user_path(uid, "eco/balance"), user_path(uid, "points/points"), amount, amount))
+        elif kind == "increment":
+            added += amount
+            ops.append(db.aincrement(user_path(uid, "eco/balance"), amount))
+        else:
+            ops.append(db.aget(user_path(uid, "eco")))
+    await asyncio.gather(*ops)
+    await db.aflush()
+    return added
+
+
+@pytest.mark.parametrize("backend_cls", [MemoryBackend, EchoBackend])
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_ledger_conserves_totals_under_concurrency(backend_cls, write_behind):
+    db = make_db(backend_cls, write_behind)
+    try:
+        # Rangliste vorher laden, damit sie während der Buchungen nachgeführt wird
+        db.leaderboard(GUILD, "eco/balance")
+        added = asyncio.run(run_ops(db, 400, seed=len(USERS) + write_behind))
+
+        stored = db.backend.get(f"servers/{GUILD}/users")
+        balances = {uid: stored[uid]["eco"]["balance"] for uid in USERS}
+        points = {uid: stored[uid]["points"]["points"] for uid in USERS}
+
+        assert sum(balances.values()) + sum(points.values()) == START_BALANCE * len(USERS) + added
+        assert min(balances.values()) >= 0
+
+        # Cache (über get) und Rangliste stimmen mit dem Backend überein
+        for uid in USERS:
+            assert db.get(user_path(uid, "eco/balance")) == balances[uid]
+            assert db.get(user_path(uid, "points/points")) == points[uid]
+        assert dict(db.leaderboard(GUILD, "eco/balance", len(USERS))) == balances
+        assert dict(db.leaderboard(GUILD, "points/points", len(USERS))) == points
+    finally:
+        db.close()
+
+
+def test_absolute_write_waits_for_inflight_increment():
+    db = make_db(HeldFlushBackend, True)
+    path = user_path(USERS[0], "eco/balance")
+    try:
+        db.add(path, 5)
+        assert db.get(path) == START_BALANCE + 5
+        flush = threading.Thread(target=db.flush)
+        flush.start()
+        assert db.backend.started.wait(5)
+        # der Flush hängt mitten im Chunk; das Überschreiben muss danach ankommen
+        writer = threading.Thread(target=db.update, args=(user_path(USERS[0], "eco"), {"balance": 105}))
+        writer.start()
+        writer.join(0.05)
+        assert writer.is_alive()
+        db.backend.resume.set()
+        flush.join(5)
+        writer.join(5)
+        db.flush()
+        assert db.backend.get(path) == 105
+        assert db.get(path) == 105
+    finally:
+        db.backend.resume.set()
+        db.close()
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_daily_with_concurrent_pay(write_behind):
+    from commands.eco import claim_daily
+
+    db = make_db(EchoBackend, write_behind)
+    now = 1_700_000_000.0
+
+    async def scenario():
+        ops = []
+        for i, uid in enumerate(USERS):
+            other = USERS[(i + 1) % len(USERS)]
+            # zweimal daily pro User: nur einer darf zahlen
+            ops.append(claim_daily(db, GUILD, uid, now))
+            ops.append(db.atransfer(user_path(uid, "eco/balance"), user_path(other, "eco/balance"), 10 + i))
+            ops.append(claim_daily(db, GUILD, uid, now))
+            ops.append(db.aincrement(user_path(other, "eco/balance"), 1))
+        results = await asyncio.gather(*ops)
+        await db.aflush()
+        return results[0::2]
+
+    try:
+        claims = asyncio.run(scenario())
+        paid = [claim for claim in claims if claim is not None]
+        assert len(paid) == len(USERS)
+
+        stored = db.backend.get(f"servers/{GUILD}/users")
+        balances = {uid: stored[uid]["eco"]["balance"] for uid in USERS}
+        assert sum(balances.values()) == START_BALANCE * len(USERS) + sum(bonus for bonus, _, _ in paid) + len(USERS)
+        assert all(stored[uid]["eco"]["daily_streak"] == 1 for uid in USERS)
+        for uid in USERS:
+            assert db.get(user_path(uid, "eco/balance")) == balances[uid]
+    finally:
+        db.close()
@@ -0,0 +1,145 @@
+"""
+DiscordOAuth gegen einen lokalen Ersatz für Discords Token- und User-Endpunkte
+(api_base zeigt auf 127.0.0.1).
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp import web
+
+from modules.oauth import DiscordOAuth, OAuthError
+
+
+async def token(req):
+    data = await req.post()
+    code = data.get("code")
+    if code == "bad":
+        return web.json_response({"error": "invalid_grant"}, status=401)
+    if code == "slow":
+        await asyncio.sleep(1.0)
+    return web.json_response({"access_token": f"token-{code}", "expires_in": 604800})
+
+
+async def me(req):
+    access_token = req.headers["Authorization"].removeprefix("Bearer ")
+    return web.json_response({"id": "42", "username": access_token, "email": "user@example.com"})
+
+
+@pytest.fixture(scope="module")
+def api_base():
+    """Startet den Ersatz-Server in einem eigenen Thread/Loop."""
+    loop = asyncio.new_event_loop()
+    app = web.Application()
+    app.add_routes([web.post("/oauth2/token", token), web.get("/users/@me", me)])
+    runner = web.AppRunner(app)
+
+    async def start():
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    port = asyncio.run_coroutine_threadsafe(start(), loop).result(5)
+    yield f"http://127.0.0.1:{port}"
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def make_oauth(api_base, **options) -> DiscordOAuth:
+    return DiscordOAuth(1, "secret", "http://localhost/login_redirect", ["identify", "email"],
+                        api_base=api_base, **options)
+
+
+def close_sync(oauth: DiscordOAuth):
+    asyncio.run_coroutine_threadsafe(oauth.close(), oauth.sync_loop).result(5)
+
+
+def test_exchange_code(api_base):
+    oauth = make_oauth(api_base)
+
+    async def run():
+        try:
+            return await oauth.exchange_code("abc")
+        finally:
+            await oauth.close()
+
+    tokens, info = asyncio.run(run())
+    assert tokens["access_token"] == "token-abc"
+    assert info == {"identify": {"id": "42", "username": "token-abc"}, "email": "user@example.com"}
+
+
+def test_rejected_code_is_client_error(api_base):
+    oauth = make_oauth(api_base)
+
+    async def run():
+        try:
+            await oauth.exchange_code("bad")
+        finally:
+            await oauth.close()
+
+    with pytest.raises(OAuthError) as error:
+        asyncio.run(run())
+    assert error.value.status == 400
+
+
+def test_unreachable_api(api_base):
+    oauth = make_oauth("http://127.0.0.1:9", timeout=1.0)
+
+    async def run():
+        try:
+            await oauth.exchange_code("abc")
+        finally:
+            await oauth.close()
+
+    with pytest.raises(OAuthError) as error:
+        asyncio.run(run())
+    assert error.value.status == 504
+
+
+def test_concurrency_limit_rejects_instead_of_queueing(api_base):
+    oauth = make_oauth(api_base, max_concurrency=2, queue_timeout=0.2)
+
+    async def run():
+        try:
+            return await asyncio.gather(*(oauth.exchange_code("slow") for _ in range(3)), return_exceptions=True)
+        finally:
+            await oauth.close()
+
+    results = asyncio.run(run())
+    errors = [result for result in results if isinstance(result, OAuthError)]
+    assert len(errors) == 1 and errors[0].status == 503
+
+
+def test_sync_login_times_out_with_504(api_base):
+    oauth = make_oauth(api_base, timeout=0.2, queue_timeout=0.1)
+    start = time.monotonic()
+    with pytest.raises(OAuthError) as error:
+        oauth.exchange_code_sync("slow")
+    assert error.value.status == 504
+    assert time.monotonic() - start < 1.0
+    close_sync(oauth)
+
+
+def test_sync_slots_keep_worker_threads_free(api_base):
+    oauth = make_oauth(api_base, sync_slots=1)
+    results = []
+    worker = threading.Thread(target=lambda: results.append(oauth.exchange_code_sync("slow")))
+    worker.start()
+    time.sleep(0.2)
+    # zweiter Login blockiert keinen weiteren Worker-Thread, sondern wird sofort abgewiesen
+    start = time.monotonic()
+    with pytest.raises(OAuthError) as error:
+        oauth.exchange_code_sync("abc")
+    assert error.value.status == 503
+    assert time.monotonic() - start < 0.1
+    worker.join()
+    assert results[0][0]["access_token"] == "token-slow"
+    assert oauth.exchange_code_sync("abc")[0]["access_token"] == "token-abc"
+    close_sync(oauth)
@@ -0,0 +1,78 @@
+"""
+Gleichzeitige Cache-Misses auf denselben Userknoten: ein Snapshot, der vor einem
+Schreibzugriff gelesen wurde, darf nicht für die TTL im Cache landen.
+Start: python -m pytest -q tests
+"""
+import threading
+
+import pytest
+
+from modules.storage import MemoryBackend
+from modules.user_cache import UserCache
+
+KEY = "servers/1/users/2"
+
+
+def test_stale_load_is_not_stored():
+    cache = UserCache()
+    found, _, first = cache.get(KEY)
+    assert not found
+    _, _, second = cache.get(KEY)
+    cache.apply(KEY, ["eco", "balance"], 5)
+    # beide Loads liefen schon vor dem Schreibzugriff -> keiner darf gespeichert werden
+    cache.put(KEY, {"eco": {"balance": 5}}, first)
+    cache.put(KEY, {"eco": {"balance": 0}}, second)
+    assert KEY not in cache.entries
+    assert not cache.loading
+
+    # ein Load, der erst nach dem Schreibzugriff beginnt, darf speichern
+    _, _, fresh = cache.get(KEY)
+    cache.put(KEY, {"eco": {"balance": 5}}, fresh)
+    assert cache.get(KEY)[:2] == (True, {"eco": {"balance": 5}})
+    assert not cache.loading
+
+
+def test_release_ends_load():
+    cache = UserCache()
+    cache.get(KEY)
+    cache.release(KEY)
+    assert not cache.loading
+
+
+class SlowBackend(MemoryBackend):
+    """Hält den ersten Read an, bis der Test ihn freigibt."""
+
+    def __init__(self, data: dict):
+        super().__init__(data)
+        self.first = True
+        self.started = threading.Event()
+        self.resume = threading.Event()
+
+    def get(self, path: str, shallow: bool = False):
+        value = super().get(path, shallow)
+        if self.first and not shallow:
+            self.first = False
+            self.started.set()
+            self.resume.wait(5)
+        return value
+
+
+def test_concurrent_miss_with_write():
+    pytest.importorskip("discord")
+    from modules.firebase_db import FirebaseDB
+
+    backend = SlowBackend({"servers": {"1": {"users": {"2": {"eco": {"balance": 0}}}}}})
+    db = FirebaseDB("", "", backend=backend, instrument=False, cache_size=10)
+    path = f"{KEY}/eco/balance"
+
+    slow = threading.Thread(target=db.get, args=(path,))
+    slow.start()
+    assert backend.started.wait(5)
+    # zweiter Miss und Schreibzugriff, während der erste Load noch den alten Stand hält
+    assert db.get(path) == 0
+    db.set(path, 7)
+    backend.resume.set()
+    slow.join(5)
+
+    assert db.get(path) == 7
+    assert backend.get(path) == 7